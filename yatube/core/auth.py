@@ -0,0 +1,132 @@
+'''Пользователь запроса из кэша вместо SELECT из auth_user.
+
+CachedAuthenticationMiddleware (core/middleware/auth.py) берёт
+пользователя сессии из общего кэша по его id. В кэше лежит не вся
+строка auth_user, а только поля USER_FIELDS и хэш для сессии
+(get_session_auth_hash); хэша пароля, почты и прочего там нет.
+Запись принимается, только если её хэш совпадает с хэшем в сессии;
+иначе, как и при промахе, пользователь загружается и проверяется
+обычным django.contrib.auth.get_user. Из записи собирается экземпляр
+User с отложенными остальными полями: обращение к ним читает базу, а
+save() пишет только загруженные поля.
+
+Сигналы сбрасывают запись при сохранении и удалении пользователя, в
+том числе при смене пароля и входе (обновляется last_login). Сброс
+увеличивает версию пользователя — сразу и ещё раз после фиксации
+транзакции, — а запись помнит версию, прочитанную до запроса к базе.
+Поэтому параллельный запрос, загрузивший пользователя до сброса, не
+вернёт в кэш устаревшую запись.
+
+Памяти процесса, как у LookupCache, здесь нет: request.user меняют
+представления (например, смена пароля), и общий для потоков объект
+менялся бы у всех запросов сразу. Из общего кэша каждый запрос
+получает свою копию.
+
+Кэш должен быть общим для процессов: сброс виден только тому процессу,
+который его выполнил. С кэшем в памяти процесса (LocMemCache) другие
+воркеры принимали бы старую сессию до AUTH_USER_CACHE_TIMEOUT, поэтому
+с ним, как и с DummyCache, пользователь всегда читается из базы.
+'''
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.crypto import constant_time_compare
+
+USER_CACHE_KEY = 'auth:user:{}'
+USER_VERSION_KEY = 'auth:user:version:{}'
+
+# Поля пользователя, которые читают middleware, шаблоны и проверки
+# прав в представлениях.
+USER_FIELDS = (
+    'id', 'username', 'first_name', 'last_name',
+    'is_active', 'is_staff', 'is_superuser',
+)
+
+
+# Кэши, которые не видят сбросов из других процессов.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def shared_cache():
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], PROCESS_LOCAL_CACHES)
+
+
+def cached_fields(model):
+    # from_db ждёт значения в порядке полей модели.
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in USER_FIELDS
+    ]
+
+
+def user_version(user_id):
+    '''Текущая версия записи пользователя, при отсутствии — новая.'''
+    key = USER_VERSION_KEY.format(user_id)
+    # Версия после вытеснения из кэша не должна совпасть со старой.
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def get_cached_user(request):
+    session = request.session
+    model = auth.get_user_model()
+    try:
+        user_id = model._meta.pk.to_python(session[auth.SESSION_KEY])
+        backend_path = session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    if not shared_cache():
+        return auth.get_user(request)
+    key = USER_CACHE_KEY.format(user_id)
+    version_key = USER_VERSION_KEY.format(user_id)
+    cached = cache.get_many((key, version_key))
+    version = cached.get(version_key)
+    if version is None:
+        version = user_version(user_id)
+    entry = cached.get(key)
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    fields = cached_fields(model)
+    if (
+        entry is not None
+        and entry['version'] == version
+        and session_hash
+        and constant_time_compare(session_hash, entry['hash'])
+    ):
+        user = model.from_db(DEFAULT_DB_ALIAS, fields, entry['values'])
+        user.backend = backend_path
+        return user
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(
+            key,
+            {
+                'version': version,
+                'hash': user.get_session_auth_hash(),
+                'values': [getattr(user, field) for field in fields],
+            },
+            settings.AUTH_USER_CACHE_TIMEOUT,
+        )
+    return user
+
+
+def _forget_user(user_id):
+    try:
+        cache.incr(USER_VERSION_KEY.format(user_id))
+    except ValueError:
+        # Версии нет: новая не совпадёт ни с одной записью.
+        pass
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def forget_user(sender, instance, **kwargs):
+    user_id = instance.pk
+    _forget_user(user_id)
+    transaction.on_commit(lambda: _forget_user(user_id))
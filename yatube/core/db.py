@@ -0,0 +1,48 @@
+'''Настройка соединений SQLite при открытии.
+
+configure_sqlite подключается к сигналу connection_created и выполняет
+прагмы из SQLITE_PRAGMAS: журнал WAL, при котором запись не блокирует
+чтение, synchronous=NORMAL, размеры кэша страниц и mmap, время
+ожидания занятой базы. Прагмы выполняются на сыром соединении sqlite3,
+поэтому не попадают в счётчики запросов Django. С CONN_MAX_AGE
+соединение и его настройки живут дольше одного запроса.
+'''
+import re
+import sqlite3
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE = re.compile(r'^(-?\d+|[a-zA-Z_]+)$')
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(str(value)):
+            raise ImproperlyConfigured(
+                f'SQLITE_PRAGMAS: invalid pragma {name}={value!r}'
+            )
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    for statement in pragma_statements(pragmas):
+        connection.connection.execute(statement)
+
+
+def backup_sqlite(source, target_name):
+    '''Копирует базу сырого соединения sqlite3 source в файл
+    target_name через backup API SQLite. Копия делается за один шаг и
+    согласована на момент его начала.
+    '''
+    target = sqlite3.connect(target_name)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
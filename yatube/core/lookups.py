@@ -0,0 +1,118 @@
+'''Кэш поиска объектов по ключу из адреса: slug группы, имя автора.
+
+LookupCache держит два уровня: LRU в памяти процесса с коротким TTL и
+общий кэш Django. Отсутствующие ключи тоже запоминаются, поэтому
+перебор несуществующих адресов не доходит до базы. Сигналы моделей
+сбрасывают ключи через forget(): в своём процессе и в общем кэше сразу,
+в остальных процессах — по истечении LOOKUP_LOCAL_TTL.
+
+Счётчики попаданий каждого кэша видны в /debug/metrics/.
+'''
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+# В общем кэше None означает промах, поэтому отсутствие объекта
+# хранится отдельным значением.
+MISSING = False
+
+lookup_caches = {}
+
+
+class LookupCache:
+    def __init__(self, name, load):
+        '''load(key) возвращает объект или None, если его нет.'''
+        self.name = name
+        self.load = load
+        self._lock = threading.Lock()
+        self._local = OrderedDict()
+        self._counts = Counter()
+        lookup_caches[name] = self
+
+    def key(self, key):
+        # Имена пользователей бывают не в ASCII, а memcached принимает
+        # только короткие ASCII-ключи.
+        digest = hashlib.md5(str(key).encode()).hexdigest()
+        return f'lookup:{self.name}:{digest}'
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._local.get(key)
+            if item is not None and item[0] > now:
+                self._local.move_to_end(key)
+                self._counts['local'] += 1
+                return self._found(item[1])
+        value = cache.get(self.key(key))
+        if value is None:
+            self._counts['miss'] += 1
+            value = self.load(key)
+            if value is None:
+                value = MISSING
+                timeout = settings.LOOKUP_NEGATIVE_TIMEOUT
+            else:
+                timeout = settings.LOOKUP_CACHE_TIMEOUT
+            cache.set(self.key(key), value, timeout)
+        else:
+            self._counts['shared'] += 1
+        self._remember(key, value, now)
+        return self._found(value)
+
+    @staticmethod
+    def _found(value):
+        return None if value is MISSING else value
+
+    def get_or_404(self, key):
+        value = self.get(key)
+        if value is None:
+            raise Http404(f'No {self.name} matches the given query.')
+        return value
+
+    def _remember(self, key, value, now):
+        with self._lock:
+            self._local[key] = (now + settings.LOOKUP_LOCAL_TTL, value)
+            self._local.move_to_end(key)
+            while len(self._local) > settings.LOOKUP_LOCAL_SIZE:
+                self._local.popitem(last=False)
+
+    def forget(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+        cache.delete_many([self.key(key) for key in keys])
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            size = len(self._local)
+        total = sum(counts.values())
+        hits = counts.get('local', 0) + counts.get('shared', 0)
+        return {
+            'local_hits': counts.get('local', 0),
+            'shared_hits': counts.get('shared', 0),
+            'misses': counts.get('miss', 0),
+            'hit_ratio': round(hits / total, 3) if total else 0,
+            'local_size': size,
+        }
+
+    def clear(self):
+        '''Очищает память процесса и счётчики; общий кэш не трогает.'''
+        with self._lock:
+            self._local.clear()
+            self._counts.clear()
+
+
+def clear_lookup_caches():
+    for lookup in lookup_caches.values():
+        lookup.clear()
+
+
+def lookup_stats():
+    return {
+        name: lookup.stats() for name, lookup in sorted(lookup_caches.items())
+    }
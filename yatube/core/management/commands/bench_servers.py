@@ -0,0 +1,175 @@
+import asyncio
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+async def serve_http(app, reader, writer):
+    '''Один запрос HTTP/1.0 к ASGI-приложению, затем соединение
+    закрывается, как у wsgiref.
+    '''
+    request_line = (await reader.readline()).decode('latin-1').split()
+    if len(request_line) != 3:
+        writer.close()
+        return
+    method, target, _ = request_line
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers.append((name.strip().lower().encode('latin-1'),
+                        value.strip().encode('latin-1')))
+    length = int(dict(headers).get(b'content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    url = urlsplit(target)
+    host, port = writer.get_extra_info('sockname')[:2]
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.0',
+        'method': method,
+        'scheme': 'http',
+        'path': url.path,
+        'query_string': url.query.encode('latin-1'),
+        'root_path': '',
+        'headers': headers,
+        'server': (host, port),
+        'client': writer.get_extra_info('peername')[:2],
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            writer.write(f'HTTP/1.0 {message["status"]} OK\r\n'.encode())
+            for name, value in message['headers']:
+                writer.write(name + b': ' + value + b'\r\n')
+            writer.write(b'Connection: close\r\n\r\n')
+        else:
+            writer.write(message.get('body', b''))
+            await writer.drain()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        writer.close()
+
+
+def start_asgi_server(app, host):
+    '''Запускает ASGI-приложение в отдельном потоке с циклом событий.'''
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    address = {}
+
+    async def main():
+        server = await asyncio.start_server(
+            lambda reader, writer: serve_http(app, reader, writer),
+            host, 0, backlog=1024,
+        )
+        address['port'] = server.sockets[0].getsockname()[1]
+        started.set()
+        async with server:
+            await server.serve_forever()
+
+    thread = threading.Thread(
+        target=loop.run_until_complete, args=(main(),), daemon=True
+    )
+    thread.start()
+    started.wait()
+    return address['port']
+
+
+def start_wsgi_server(app, host):
+    server = make_server(
+        host, 0, app,
+        server_class=ThreadingWSGIServer, handler_class=QuietHandler,
+    )
+    server.request_queue_size = 1024
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность yatube.wsgi и yatube.asgi '
+        'под конкурентной нагрузкой на локальных серверах'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['/'], help='Адреса для запросов'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=32,
+            help='Одновременных клиентов',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Запросов на каждый сервер',
+        )
+
+    def load(self, port, paths, total, concurrency):
+        def fetch(number):
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            started = time.perf_counter()
+            connection.request('GET', paths[number % len(paths)])
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status != 200:
+                raise CommandError(
+                    f'{paths[number % len(paths)]} ответил {response.status}'
+                )
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            timings = list(pool.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        return {
+            'rps': total / elapsed,
+            'p50': statistics.median(timings),
+            'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        }
+
+    def handle(self, *args, **options):
+        from yatube.asgi import application as asgi_application
+        from yatube.wsgi import application as wsgi_application
+
+        servers = (
+            ('WSGI', start_wsgi_server(wsgi_application, '127.0.0.1')),
+            ('ASGI', start_asgi_server(asgi_application, '127.0.0.1')),
+        )
+        self.stdout.write(
+            f'{"сервер":<8} {"запр/с":>9} {"p50, мс":>9} {"p99, мс":>9}'
+        )
+        for name, port in servers:
+            self.load(port, options['paths'], 50, options['concurrency'])
+            result = self.load(
+                port, options['paths'], options['requests'],
+                options['concurrency'],
+            )
+            self.stdout.write(
+                f'{name:<8} {result["rps"]:>9.0f} {result["p50"]:>9.2f} '
+                f'{result["p99"]:>9.2f}'
+            )
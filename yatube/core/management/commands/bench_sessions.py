@@ -0,0 +1,79 @@
+import statistics
+import time
+from contextlib import ExitStack
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed': 'core.signed_sessions',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает движки сессий на posts:index вошедшего пользователя: '
+        'время и SQL-запросы на запрос, из них к django_session'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=200, help='Запросов на движок'
+        )
+
+    def measure(self, engine, user, url, repeat):
+        with override_settings(SESSION_ENGINE=engine):
+            client = Client()
+            client.force_login(user)
+            client.get(url)
+            timings = []
+            queries = []
+            for _ in range(repeat):
+                with ExitStack() as stack:
+                    contexts = [
+                        stack.enter_context(CaptureQueriesContext(connection))
+                        for connection in connections.all()
+                    ]
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f'{url} ответил {response.status_code}')
+                queries.append([
+                    query['sql'] for context in contexts for query in context
+                ])
+        session = [
+            sum('django_session' in sql for sql in request)
+            for request in queries
+        ]
+        return (
+            statistics.median(timings),
+            statistics.mean(len(request) for request in queries),
+            statistics.mean(session),
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by('pk').first()
+        if user is None:
+            raise CommandError(
+                'В базе нет пользователей, запустите seed_bench'
+            )
+        url = reverse('posts:index')
+        self.stdout.write(
+            f'{"движок":<10} {"p50, мс":>9} {"запросов":>9} {"сессия":>9}'
+        )
+        for name, engine in SESSION_ENGINES.items():
+            p50, queries, session = self.measure(
+                engine, user, url, options['repeat']
+            )
+            self.stdout.write(
+                f'{name:<10} {p50:>9.2f} {queries:>9.1f} {session:>9.1f}'
+            )
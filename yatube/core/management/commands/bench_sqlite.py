@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+# Настройки Django по умолчанию: журнал отката, полная синхронизация,
+# ожидание блокировки модулем sqlite3 (5 секунд) и новое соединение на
+# каждый запрос.
+DEFAULT_PRAGMAS = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает базу читателями index и писателями post_create и '
+        'сравнивает настройки SQLite по умолчанию с SQLITE_PRAGMAS. '
+        'Создаёт посты в текущей базе: запускайте на копии'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=8, help='Потоков чтения'
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2, help='Потоков записи'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=5, help='Секунд на прогон'
+        )
+
+    def client(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def worker(self, request, deadline, results, latencies):
+        counts = Counter()
+        timings = []
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    request()
+                except OperationalError as error:
+                    kind = 'locked' if 'locked' in str(error) else 'errors'
+                    counts[kind] += 1
+                else:
+                    counts['ok'] += 1
+                    timings.append(time.perf_counter() - started)
+        finally:
+            connections.close_all()
+        results.update(counts)
+        latencies.extend(timings)
+
+    def run(self, pragmas, conn_max_age, user, options):
+        connections.close_all()
+        # Соединения потоков создаются по этому словарю настроек.
+        database = connections.databases['default']
+        saved_max_age = database.get('CONN_MAX_AGE', 0)
+        database['CONN_MAX_AGE'] = conn_max_age
+        try:
+            return self.load(pragmas, user, options)
+        finally:
+            database['CONN_MAX_AGE'] = saved_max_age
+
+    def load(self, pragmas, user, options):
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            index = reverse('posts:index')
+            create = reverse('posts:post_create')
+            readers = [self.client(user) for _ in range(options['readers'])]
+            writers = [self.client(user) for _ in range(options['writers'])]
+            connections.close_all()
+            stats = {'read': Counter(), 'write': Counter()}
+            latencies = {'read': [], 'write': []}
+            deadline = time.perf_counter() + options['duration']
+            threads = [
+                threading.Thread(target=self.worker, args=(
+                    lambda client=client: client.get(index),
+                    deadline, stats['read'], latencies['read'],
+                ))
+                for client in readers
+            ] + [
+                threading.Thread(target=self.worker, args=(
+                    lambda client=client: client.post(
+                        create, {'text': 'Пост из bench_sqlite'}
+                    ),
+                    deadline, stats['write'], latencies['write'],
+                ))
+                for client in writers
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            connections.close_all()
+        return stats, latencies
+
+    def report(self, name, stats, latencies, duration):
+        for kind in ('read', 'write'):
+            counts = stats[kind]
+            total = sum(counts.values())
+            timings = sorted(latencies[kind])
+            p99 = timings[int(len(timings) * 0.99)] * 1000 if timings else 0
+            locked = counts['locked'] / total * 100 if total else 0
+            self.stdout.write(
+                f'{name:<10} {kind:<6} {counts["ok"] / duration:>9.1f} '
+                f'{p99:>9.1f} {locked:>9.2f} {counts["errors"]:>7}'
+            )
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by('pk').first()
+        if user is None:
+            raise CommandError(
+                'В базе нет пользователей, запустите seed_bench'
+            )
+        profiles = (
+            ('default', DEFAULT_PRAGMAS, 0),
+            (
+                'pragmas',
+                settings.SQLITE_PRAGMAS,
+                settings.DATABASES['default'].get('CONN_MAX_AGE', 0),
+            ),
+        )
+        self.stdout.write(
+            f'{"профиль":<10} {"поток":<6} {"запр/с":>9} {"p99, мс":>9} '
+            f'{"locked,%":>9} {"ошибок":>7}'
+        )
+        for name, pragmas, conn_max_age in profiles:
+            stats, latencies = self.run(pragmas, conn_max_age, user, options)
+            self.report(name, stats, latencies, options['duration'])
@@ -0,0 +1,43 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии пачками: в отличие от clearsessions, '
+        'запись в базу не блокируется на всё время чистки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько сессий удалять одним запросом',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        engine = import_module(settings.SESSION_ENGINE)
+        if not hasattr(engine.SessionStore, 'get_model_class'):
+            # Сессии в cookie и в кэше истекают сами, а подписанные
+            # сессии чистят здесь свой список отзыва.
+            engine.SessionStore.clear_expired()
+            self.stdout.write(
+                f'{settings.SESSION_ENGINE}: выполнен clear_expired()'
+            )
+            return
+        sessions = engine.SessionStore.get_model_class().objects
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                sessions.filter(expire_date__lt=now)
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            deleted += sessions.filter(pk__in=keys).delete()[0]
+        self.stdout.write(f'Удалено истёкших сессий: {deleted}')
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db import backup_sqlite
+from core.routers import mark_replica_synced, replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплику REPLICA_DATABASE; '
+        'с --interval повторяет копирование в фоне'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Пауза между копированиями в секундах; 0 — одно копирование',
+        )
+
+    def get_replica(self):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('Реплика не задана: REPLICA_DATABASE')
+        primary = connections['default']
+        replica = connections[alias]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError(
+                'replicate_db копирует только SQLite; у других баз '
+                'есть своя репликация'
+            )
+        if primary.settings_dict['NAME'] == replica.settings_dict['NAME']:
+            raise CommandError('Реплика и основная база — один файл')
+        return replica.settings_dict['NAME']
+
+    def replicate(self, target_name):
+        source = connections['default']
+        source.ensure_connection()
+        # Время снимка берётся до копирования: изменения во время
+        # него в копию могут не попасть.
+        synced_at = time.time()
+        started = time.perf_counter()
+        backup_sqlite(source.connection, target_name)
+        mark_replica_synced(synced_at)
+        return (time.perf_counter() - started) * 1000
+
+    def handle(self, *args, **options):
+        target_name = self.get_replica()
+        while True:
+            ms = self.replicate(target_name)
+            self.stdout.write(f'Реплика обновлена за {ms:.1f} мс')
+            if options['interval'] <= 0:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны и сообщает об ошибках разбора. Воркеры '
+        'делают то же при старте, если включён TEMPLATES_WARMUP'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        loaded, errors = warm_templates()
+        elapsed = (time.perf_counter() - started) * 1000
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        self.stdout.write(
+            f'Скомпилировано шаблонов: {loaded} за {elapsed:.1f} мс'
+        )
+        if errors:
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}')
@@ -0,0 +1,152 @@
+'''Учёт стоимости запросов: SQL, шаблоны, размер ответа.
+
+RequestMetricsMiddleware заводит на выбранный запрос RequestMetrics и
+делает его текущим для потока. Время SQL приходит из execute_wrapper
+соединений, время шаблонов — из бэкенда TimedDjangoTemplates. Сводка
+по представлениям хранится в памяти процесса.
+'''
+import heapq
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    '''Метрики одного запроса.'''
+
+    def __init__(self, slow_queries=3):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.slow_queries_limit = slow_queries
+        self._slow = []
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    @property
+    def slow_queries(self):
+        return [
+            {'sql': sql, 'ms': round(ms, 3)}
+            for ms, _, sql in sorted(self._slow, reverse=True)
+        ]
+
+    def add_query(self, sql, ms):
+        self.queries += 1
+        self.db_ms += ms
+        item = (ms, self.queries, sql[:500])
+        if len(self._slow) < self.slow_queries_limit:
+            heapq.heappush(self._slow, item)
+        elif self._slow and ms > self._slow[0][0]:
+            heapq.heapreplace(self._slow, item)
+
+    def __call__(self, execute, sql, params, many, context):
+        '''execute_wrapper: засекает время каждого SQL-запроса.'''
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add_query(sql, (time.perf_counter() - started) * 1000)
+
+
+def current_metrics():
+    return getattr(_local, 'metrics', None)
+
+
+def set_current_metrics(metrics):
+    _local.metrics = metrics
+
+
+class TimedTemplate(Template):
+    '''Шаблон, который добавляет время отрисовки к метрикам запроса.
+
+    Вложенные render_to_string (например, карточки постов внутри
+    ленты) не считаются повторно.
+    '''
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics()
+        if metrics is None:
+            return super().render(context, request)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_ms += (
+                    (time.perf_counter() - started) * 1000
+                )
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class ViewStats:
+    '''Скользящая сводка по представлению: последние window запросов.'''
+
+    FIELDS = ('total_ms', 'db_ms', 'template_ms', 'queries', 'bytes')
+
+    def __init__(self, window):
+        self.count = 0
+        self.samples = deque(maxlen=window)
+
+    def add(self, sample):
+        self.count += 1
+        self.samples.append(sample)
+
+    def summary(self):
+        samples = list(self.samples)
+        summary = {'count': self.count, 'window': len(samples)}
+        for field in self.FIELDS:
+            values = sorted(sample[field] for sample in samples)
+            if not values:
+                continue
+            summary[f'{field}_avg'] = round(sum(values) / len(values), 3)
+            summary[f'{field}_p95'] = round(
+                values[min(len(values) - 1, int(len(values) * 0.95))], 3
+            )
+            summary[f'{field}_max'] = round(values[-1], 3)
+        return summary
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(self._new_stats)
+
+    def _new_stats(self):
+        return ViewStats(getattr(settings, 'REQUEST_METRICS_WINDOW', 500))
+
+    def record(self, view_name, sample):
+        with self._lock:
+            self._views[view_name].add(sample)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view_name: stats.summary()
+                for view_name, stats in sorted(self._views.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
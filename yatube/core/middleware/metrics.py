@@ -0,0 +1,72 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core.metrics import RequestMetrics, registry, set_current_metrics
+
+logger = logging.getLogger('core.metrics')
+
+
+class RequestMetricsMiddleware:
+    '''Считает SQL-запросы, время базы и шаблонов для доли запросов.
+
+    Выбранный запрос получает заголовок Server-Timing, строку JSON в
+    логгере core.metrics и попадает в сводку по представлениям.
+    Доля задаётся REQUEST_METRICS_SAMPLE_RATE от 0 до 1.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 1.0)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+        metrics = RequestMetrics(
+            getattr(settings, 'REQUEST_METRICS_SLOW_QUERIES', 3)
+        )
+        set_current_metrics(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            set_current_metrics(None)
+        self.finish(request, response, metrics)
+        return response
+
+    def finish(self, request, response, metrics):
+        match = request.resolver_match
+        view_name = match.view_name if match else '<unresolved>'
+        size = None if response.streaming else len(response.content)
+        total_ms = metrics.total_ms
+        sample = {
+            'total_ms': total_ms,
+            'db_ms': metrics.db_ms,
+            'template_ms': metrics.template_ms,
+            'queries': metrics.queries,
+            'bytes': size or 0,
+        }
+        registry.record(view_name, sample)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics.db_ms:.2f};desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ))
+        logger.info(json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 3),
+            'db_ms': round(metrics.db_ms, 3),
+            'template_ms': round(metrics.template_ms, 3),
+            'queries': metrics.queries,
+            'bytes': size,
+            'slow_queries': metrics.slow_queries,
+        }, ensure_ascii=False))
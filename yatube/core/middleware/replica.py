@@ -0,0 +1,24 @@
+from core.routers import (
+    pin_to_primary, start_write_tracking, stop_write_tracking,
+)
+
+
+class ReplicaPinMiddleware:
+    '''Ставит cookie, которая на REPLICA_PIN_SECONDS отправляет чтения
+    посетителя в основную базу, если запрос в неё что-то записал.
+
+    Стоит выше SessionMiddleware, чтобы видеть и сохранение сессии.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_write_tracking()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = stop_write_tracking(token)
+        if wrote:
+            pin_to_primary(response)
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.19 on 2026-10-18 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedSession',
+            fields=[
+                ('session_id', models.CharField(max_length=32, primary_key=True, serialize=False, verbose_name='Идентификатор сессии')),
+                ('expire_date', models.DateTimeField(db_index=True, verbose_name='Действует до')),
+            ],
+            options={
+                'verbose_name': 'Отозванная сессия',
+                'verbose_name_plural': 'Отозванные сессии',
+            },
+        ),
+    ]
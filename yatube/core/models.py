@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class RevokedSession(models.Model):
+    '''Отозванная сессия в подписанной cookie (см. core.signed_sessions).
+
+    Хранится до истечения подписи cookie, потом её удаляет
+    clear_expired_sessions.
+    '''
+    session_id = models.CharField(
+        max_length=32, primary_key=True, verbose_name='Идентификатор сессии'
+    )
+    expire_date = models.DateTimeField(
+        db_index=True, verbose_name='Действует до'
+    )
+
+    class Meta:
+        verbose_name_plural = 'Отозванные сессии'
+        verbose_name = 'Отозванная сессия'
+
+    def __str__(self):
+        '''Возвращает строковое представление модели'''
+        return self.session_id
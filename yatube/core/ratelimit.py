@@ -0,0 +1,171 @@
+'''Ограничение частоты POST-запросов входа и регистрации.
+
+Каждый маршрут из RATELIMITS получает корзины токенов по IP и, если
+задано, по имени пользователя из формы. Корзина вмещает capacity
+токенов и заполняется заново за period секунд; запрос забирает по
+токену из каждой своей корзины. Если хоть одна пуста, rate_limit
+отвечает 429 с Retry-After ещё до представления, то есть до
+проверки или хэширования пароля. За обратным прокси адрес клиента
+берётся из заголовка RATELIMIT_IP_HEADER (см. client_ip).
+
+Состояние корзин хранится в общем кэше. Чтение и запись не атомарны:
+параллельные запросы могут пропустить пару лишних попыток, что для
+защиты от перебора некритично. Если кэш недоступен, корзины живут в
+памяти процесса. Счётчики пропущенных и отклонённых запросов видны
+в /debug/metrics/.
+'''
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+RATELIMIT_KEY = 'ratelimit:{}:{}:{}'
+TOO_MANY_REQUESTS = 429
+
+_lock = threading.Lock()
+_local = OrderedDict()
+_counts = Counter()
+
+
+def bucket_key(route, kind, value):
+    digest = hashlib.md5(str(value).encode()).hexdigest()
+    return RATELIMIT_KEY.format(route, kind, digest)
+
+
+def refill(state, capacity, period, now):
+    '''Число токенов в корзине к моменту now.'''
+    if state is None:
+        return capacity
+    tokens, updated = state
+    return min(capacity, tokens + (now - updated) * capacity / period)
+
+
+def _load(keys):
+    try:
+        return cache.get_many(keys)
+    except Exception:
+        logger.warning('Кэш недоступен, корзины в памяти', exc_info=True)
+    with _lock:
+        return {key: _local[key] for key in keys if key in _local}
+
+
+def _store(states, period):
+    try:
+        cache.set_many(states, period)
+        return
+    except Exception:
+        logger.warning('Кэш недоступен, корзины в памяти', exc_info=True)
+    with _lock:
+        _local.update(states)
+        for key in states:
+            _local.move_to_end(key)
+        while len(_local) > settings.RATELIMIT_LOCAL_SIZE:
+            _local.popitem(last=False)
+
+
+def take_tokens(route, identities):
+    '''Забирает токен из корзины каждой пары (вид, значение).
+
+    Возвращает 0, если запрос пропущен, иначе сколько секунд ждать
+    токена в самой пустой корзине; тогда токены не забираются.
+    '''
+    limits = settings.RATELIMITS.get(route, {})
+    buckets = {
+        bucket_key(route, kind, value): limits[kind]
+        for kind, value in identities
+        if kind in limits and value
+    }
+    if not buckets:
+        return 0
+    now = time.time()
+    states = _load(list(buckets))
+    tokens = {
+        key: refill(states.get(key), capacity, period, now)
+        for key, (capacity, period) in buckets.items()
+    }
+    wait = max(
+        (1 - tokens[key]) * period / capacity
+        for key, (capacity, period) in buckets.items()
+    )
+    if wait > 0:
+        return wait
+    _store(
+        {key: (value - 1, now) for key, value in tokens.items()},
+        max(period for _, period in buckets.values()),
+    )
+    return 0
+
+
+def client_ip(request):
+    '''Адрес клиента с учётом RATELIMIT_IP_HEADER.
+
+    Каждый прокси дописывает адрес в конец заголовка, поэтому клиент —
+    RATELIMIT_TRUSTED_PROXIES-й адрес с конца. Если адресов меньше,
+    запрос пришёл в обход прокси, и берётся REMOTE_ADDR.
+    '''
+    header = settings.RATELIMIT_IP_HEADER
+    proxies = settings.RATELIMIT_TRUSTED_PROXIES
+    if header and proxies > 0:
+        addresses = [
+            address.strip()
+            for address in request.META.get(header, '').split(',')
+            if address.strip()
+        ]
+        if len(addresses) >= proxies:
+            return addresses[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def rate_limit(route, username_field=None):
+    '''Ограничивает POST-запросы представления по лимитам route.'''
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'POST':
+                return view(request, *args, **kwargs)
+            identities = [('ip', client_ip(request))]
+            if username_field:
+                username = request.POST.get(username_field, '')
+                identities.append(('username', username.strip().lower()))
+            wait = take_tokens(route, identities)
+            with _lock:
+                _counts[route, 'rejected' if wait else 'allowed'] += 1
+            if wait:
+                response = HttpResponse(
+                    'Слишком много попыток, попробуйте позже.',
+                    content_type='text/plain; charset=utf-8',
+                    status=TOO_MANY_REQUESTS,
+                )
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def rate_limit_stats():
+    with _lock:
+        counts = dict(_counts)
+    return {
+        route: {
+            'allowed': counts.get((route, 'allowed'), 0),
+            'rejected': counts.get((route, 'rejected'), 0),
+        }
+        for route in sorted({route for route, _ in counts})
+    }
+
+
+def clear_rate_limits():
+    '''Очищает корзины в памяти процесса и счётчики.'''
+    with _lock:
+        _local.clear()
+        _counts.clear()
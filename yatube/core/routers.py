@@ -0,0 +1,150 @@
+'''Чтение с реплики базы, запись в основную.
+
+PrimaryReplicaRouter направляет на реплику (алиас REPLICA_DATABASE)
+только чтения внутри представлений с декоратором replica_reads; всё
+остальное, включая любую запись, идёт в default. Реплика отстаёт от
+основной базы до следующего прогона replicate_db, поэтому:
+
+- запрос, который что-то записал, получает cookie REPLICA_PIN_COOKIE
+  (ReplicaPinMiddleware), и следующие REPLICA_PIN_SECONDS секунд
+  автор читает основную базу и видит свои изменения;
+- сессия и пользователь читаются с основной базы до входа в реплику:
+  только что выполненный вход на реплике ещё не виден;
+- страница, ленты которой менялись позже снимка реплики, читается с
+  основной базы (read_primary_if_stale): иначе устаревшая страница
+  попала бы в кэш под новой версией ленты.
+
+Время снимка replicate_db записывает в файл рядом с файлом реплики
+(replica_synced_path): его читают все процессы сервера, которым видна
+сама реплика, а кэш процесса — нет. Пока файла нет, реплика не
+используется.
+'''
+import os
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Алиас базы для чтений текущего запроса; None — основная база.
+_read_alias = ContextVar('read_alias', default=None)
+# Список записей текущего запроса, который заводит ReplicaPinMiddleware.
+_writes = ContextVar('writes', default=None)
+
+
+def replica_alias():
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def replica_synced_path():
+    '''Файл со временем снимка реплики или None, если реплики нет.'''
+    alias = replica_alias()
+    if alias is None:
+        return None
+    return f"{connections[alias].settings_dict['NAME']}.synced"
+
+
+def replica_synced_at():
+    '''time.time() начала последнего снимка или None, если его нет.'''
+    path = replica_synced_path()
+    if path is None:
+        return None
+    try:
+        with open(path) as synced:
+            return float(synced.read())
+    except (OSError, ValueError):
+        return None
+
+
+def mark_replica_synced(timestamp):
+    # Замена файла атомарна: читатель видит старое время или новое.
+    path = replica_synced_path()
+    with open(f'{path}.tmp', 'w') as synced:
+        synced.write(repr(timestamp))
+    os.replace(f'{path}.tmp', path)
+
+
+def is_pinned(request):
+    return settings.REPLICA_PIN_COOKIE in request.COOKIES
+
+
+def replica_reads(view):
+    '''Читает данные представления с реплики, если она задана и уже
+    снята, а посетитель недавно ничего не записывал.
+    '''
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = replica_alias()
+        if (
+            alias is None
+            or request.method not in SAFE_METHODS
+            or is_pinned(request)
+            or replica_synced_at() is None
+        ):
+            return view(request, *args, **kwargs)
+        # Пользователь из сессии загружается сейчас, с основной базы.
+        request.user.is_authenticated
+        token = _read_alias.set(alias)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+def read_primary_if_stale(modified):
+    '''Переключает запрос на основную базу, если реплика снята раньше
+    modified (time.time() последнего изменения данных страницы).
+    None — время неизвестно.
+    '''
+    if _read_alias.get() is None:
+        return
+    synced_at = replica_synced_at()
+    if modified is None or synced_at is None or synced_at < modified:
+        _read_alias.set(None)
+
+
+def start_write_tracking():
+    return _writes.set([])
+
+
+def stop_write_tracking(token):
+    '''Возвращает, записывал ли что-то запрос, и сбрасывает учёт.'''
+    writes = _writes.get()
+    _writes.reset(token)
+    return bool(writes)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        writes = _writes.get()
+        if writes is not None and not writes:
+            writes.append(model._meta.label)
+        # После записи запрос дочитывает основную базу.
+        _read_alias.set(None)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Объекты с реплики и основной базы — одни и те же строки.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплики приходит вместе с данными из replicate_db.
+        return db == 'default'
+
+
+def pin_to_primary(response):
+    response.set_cookie(
+        settings.REPLICA_PIN_COOKIE,
+        str(int(time.time())),
+        max_age=settings.REPLICA_PIN_SECONDS,
+        httponly=True,
+        samesite='Lax',
+    )
@@ -0,0 +1,86 @@
+'''Сессии в подписанной cookie с отзывом на сервере.
+
+Движок для SESSION_ENGINE = 'core.signed_sessions'. Данные сессии
+живут в cookie, как у django.contrib.sessions.backends.signed_cookies,
+и запрос не читает ни базу, ни кэш сессий. Подписанную cookie нельзя
+удалить у клиента, поэтому каждая сессия получает случайный
+идентификатор, а выход и смена ключа при входе записывают его в таблицу
+RevokedSession на SESSION_COOKIE_AGE — дольше подпись не проживёт.
+
+Список отзыва не хранится в кэше: кэш вытесняет записи и бывает своим
+у каждого процесса, а отозванная сессия должна оставаться отозванной
+везде. Проверка отзыва — один запрос по первичному ключу на запрос,
+который читает сессию, всегда к основной базе: реплика может отставать.
+Если база недоступна, сессия считается отозванной.
+'''
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends import signed_cookies
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import RevokedSession
+
+logger = logging.getLogger(__name__)
+
+SESSION_ID_KEY = '_session_id'
+
+
+def is_revoked(session_id):
+    try:
+        return RevokedSession.objects.using(DEFAULT_DB_ALIAS).filter(
+            pk=session_id
+        ).exists()
+    except DatabaseError:
+        logger.warning(
+            'Список отзыва недоступен, сессия не принята', exc_info=True
+        )
+        return True
+
+
+class SessionStore(signed_cookies.SessionStore):
+    def load(self):
+        data = super().load()
+        session_id = data.get(SESSION_ID_KEY)
+        if session_id and is_revoked(session_id):
+            self.create()
+            return {}
+        return data
+
+    def save(self, must_create=False):
+        self._session.setdefault(SESSION_ID_KEY, get_random_string(32))
+        super().save(must_create)
+
+    def revoke(self):
+        session_id = self._session.get(SESSION_ID_KEY)
+        if session_id:
+            RevokedSession.objects.using(DEFAULT_DB_ALIAS).get_or_create(
+                session_id=session_id,
+                defaults={'expire_date': timezone.now() + timedelta(
+                    seconds=settings.SESSION_COOKIE_AGE
+                )},
+            )
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            self.revoke()
+        super().delete(session_key)
+
+    def flush(self):
+        # flush() очищает данные раньше, чем вызывает delete().
+        self.revoke()
+        super().flush()
+
+    def cycle_key(self):
+        # Старая cookie после входа или смены пароля больше не
+        # принимается.
+        self.revoke()
+        self._session.pop(SESSION_ID_KEY, None)
+        super().cycle_key()
+
+    @classmethod
+    def clear_expired(cls):
+        RevokedSession.objects.filter(expire_date__lt=timezone.now()).delete()
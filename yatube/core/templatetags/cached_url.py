@@ -0,0 +1,85 @@
+'''Тег {% url %} с запоминанием результата reverse().
+
+После {% load cached_url %} тег url шаблона заменяется этой версией с
+тем же синтаксисом. Одинаковые ссылки (карточки постов, шапка) строятся
+через резолвер один раз и дальше берутся из LRU-кэша процесса размером
+URL_CACHE_SIZE. Ключ включает префикс скрипта и urlconf текущего потока.
+'''
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.defaulttags import URLNode, url as url_tag
+from django.urls import NoReverseMatch, get_script_prefix, get_urlconf, reverse
+from django.utils.html import conditional_escape
+
+register = template.Library()
+
+CACHE_SETTINGS = {'URL_CACHE_SIZE', 'ROOT_URLCONF', 'FORCE_SCRIPT_NAME'}
+
+
+def _make_cache():
+    @lru_cache(maxsize=getattr(settings, 'URL_CACHE_SIZE', 4096))
+    def cached_reverse(view_name, args, kwargs, current_app, prefix,
+                       urlconf):
+        return reverse(
+            view_name,
+            urlconf=urlconf,
+            args=args,
+            kwargs=dict(kwargs),
+            current_app=current_app,
+        )
+    return cached_reverse
+
+
+cached_reverse = _make_cache()
+
+
+@receiver(setting_changed)
+def reset_url_cache(*, setting, **kwargs):
+    global cached_reverse
+    if setting in CACHE_SETTINGS:
+        cached_reverse = _make_cache()
+
+
+class CachedURLNode(URLNode):
+    def render(self, context):
+        # reverse() приводит аргументы к строкам, поэтому ключ по str()
+        # не меняет результат, а объекты моделей не держатся в кэше.
+        args = tuple(str(arg.resolve(context)) for arg in self.args)
+        kwargs = tuple(sorted(
+            (key, str(value.resolve(context)))
+            for key, value in self.kwargs.items()
+        ))
+        view_name = self.view_name.resolve(context)
+        try:
+            current_app = context.request.current_app
+        except AttributeError:
+            try:
+                current_app = context.request.resolver_match.namespace
+            except AttributeError:
+                current_app = None
+        url = ''
+        try:
+            url = cached_reverse(
+                view_name, args, kwargs, current_app,
+                get_script_prefix(), get_urlconf(),
+            )
+        except NoReverseMatch:
+            if self.asvar is None:
+                raise
+        if self.asvar:
+            context[self.asvar] = url
+            return ''
+        if context.autoescape:
+            url = conditional_escape(url)
+        return url
+
+
+@register.tag
+def url(parser, token):
+    '''{% url %} с LRU-кэшем; синтаксис как у встроенного тега.'''
+    node = url_tag(parser, token)
+    return CachedURLNode(node.view_name, node.args, node.kwargs, node.asvar)
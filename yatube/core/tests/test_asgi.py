@@ -0,0 +1,82 @@
+import asyncio
+import io
+from http import HTTPStatus
+
+from django.test import SimpleTestCase
+
+from yatube.asgi import application
+
+
+def call_asgi(path, method='GET', body=b'', headers=()):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), *headers],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 5000),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    return messages
+
+
+class ASGIBridgeTest(SimpleTestCase):
+    def test_page_is_served(self):
+        '''Проверка: страница отдаётся через ASGI, тело в конце
+        завершается сообщением без more_body.
+        '''
+        start, *body = call_asgi('/about/author/')
+        self.assertEqual(start['type'], 'http.response.start')
+        self.assertEqual(start['status'], HTTPStatus.OK)
+        self.assertIn(
+            (b'content-type', b'text/html; charset=utf-8'), start['headers']
+        )
+        self.assertFalse(body[-1].get('more_body', False))
+        content = b''.join(message['body'] for message in body)
+        self.assertIn('Об авторе'.encode(), content)
+
+    def test_unknown_page(self):
+        '''Проверка: неизвестный адрес отвечает 404.'''
+        start, *_ = call_asgi('/нет-такой-страницы/')
+        self.assertEqual(start['status'], HTTPStatus.NOT_FOUND)
+
+    def test_environ(self):
+        '''Проверка: заголовки, путь и тело запроса попадают в environ
+        по правилам WSGI.
+        '''
+        environ = application.build_environ(
+            {
+                'type': 'http',
+                'method': 'POST',
+                'path': '/поиск/',
+                'query_string': b'q=1',
+                'headers': [
+                    (b'content-type', b'text/plain'),
+                    (b'content-length', b'4'),
+                    (b'accept', b'text/html'),
+                    (b'accept', b'*/*'),
+                ],
+            },
+            io.BytesIO(b'body'),
+        )
+        self.assertEqual(
+            environ['PATH_INFO'].encode('latin-1').decode(), '/поиск/'
+        )
+        self.assertEqual(environ['QUERY_STRING'], 'q=1')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(environ['CONTENT_LENGTH'], '4')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,*/*')
+        self.assertEqual(environ['wsgi.input'].read(), b'body')
@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..auth import USER_CACHE_KEY
+
+User = get_user_model()
+
+
+class CachedUserTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.another_user = User.objects.create_user(username='Another')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        cls.cache_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.cache_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        # Сбросы пользователя видны другим процессам только в общем
+        # кэше; с кэшем процесса пользователь не кэшируется.
+        shared_cache = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self.cache_dir,
+        }})
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(reverse('posts:index'))
+        user_queries = [
+            query for query in context
+            if 'FROM "auth_user" WHERE "auth_user"."id"' in query['sql']
+        ]
+        return response.wsgi_request.user, user_queries
+
+    def test_user_is_read_once(self):
+        '''Проверка: пользователь сессии читается из базы один раз.'''
+        user, queries = self.get()
+        self.assertEqual(user, self.user)
+        self.assertEqual(len(queries), 1)
+        user, queries = self.get()
+        self.assertEqual(user, self.user)
+        self.assertEqual(queries, [])
+
+    def test_process_local_cache_is_not_used(self):
+        '''Проверка: с кэшем в памяти процесса пользователь читается из
+        базы на каждом запросе и в кэш не попадает.
+        '''
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}):
+            for _ in range(2):
+                user, queries = self.get()
+                self.assertEqual(user, self.user)
+                self.assertEqual(len(queries), 1)
+            self.assertIsNone(cache.get(USER_CACHE_KEY.format(self.user.pk)))
+
+    def test_user_save_is_visible(self):
+        '''Проверка: изменение пользователя сбрасывает кэш.'''
+        self.get()
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое имя'
+        user.save()
+        self.assertEqual(self.get()[0].first_name, 'Новое имя')
+
+    def test_cached_user_is_a_projection(self):
+        '''Проверка: в кэше нет хэша пароля и почты, а сохранение
+        пользователя из кэша не затирает незагруженные поля.
+        '''
+        User.objects.filter(pk=self.user.pk).update(email='m@example.com')
+        self.get()
+        user, queries = self.get()
+        self.assertEqual(queries, [])
+        entry = cache.get(USER_CACHE_KEY.format(self.user.pk))
+        password = User.objects.get(pk=self.user.pk).password
+        self.assertNotIn(password, entry['values'])
+        self.assertNotIn('m@example.com', entry['values'])
+        user.first_name = 'Новое имя'
+        user.save()
+        saved = User.objects.get(pk=self.user.pk)
+        self.assertEqual(saved.first_name, 'Новое имя')
+        self.assertEqual(saved.password, password)
+        self.assertEqual(saved.email, 'm@example.com')
+
+    def test_stale_entry_is_not_accepted(self):
+        '''Проверка: запись, загруженная до изменения пользователя и
+        записанная в кэш после сброса, не принимается.
+        '''
+        self.get()
+        key = USER_CACHE_KEY.format(self.user.pk)
+        stale = cache.get(key)
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        # Параллельный запрос вернул в кэш прочитанное до сохранения.
+        cache.set(key, stale)
+        self.assertFalse(self.get()[0].is_authenticated)
+
+    def test_password_change_ends_session(self):
+        '''Проверка: после смены пароля старая сессия не принимается.'''
+        self.get()
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-password-123')
+        user.save()
+        self.assertFalse(self.get()[0].is_authenticated)
+
+    def test_post_edit_checks_cached_author(self):
+        '''Проверка: пользователь из кэша редактирует свой пост,
+        а чужой — нет.
+        '''
+        another_client = Client()
+        another_client.force_login(self.another_user)
+        url = reverse('posts:post_edit', kwargs={'post_id': self.post.pk})
+        for _ in range(2):
+            self.assertEqual(self.authorized_client.get(url).status_code, 200)
+            self.assertRedirects(
+                another_client.get(url),
+                reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            )
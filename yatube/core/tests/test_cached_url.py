@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import clear_script_prefix, set_script_prefix
+
+from posts.models import Group, Post
+
+from ..templatetags import cached_url
+
+User = get_user_model()
+
+LINKS = (
+    "{% url 'posts:profile' post.author %}|"
+    "{% url 'posts:post_detail' post.id %}|"
+    "{% url 'posts:group_list' post.group.slug %}|"
+    "{% url 'posts:post_edit' post_id=post.id %}|"
+    "{% url 'posts:missing' as missing %}{{ missing }}"
+)
+
+
+class CachedUrlTagTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cached_url.cached_reverse.cache_clear()
+
+    def render(self, source):
+        return Template(source).render(Context({'post': self.post}))
+
+    def test_same_output_as_builtin_url(self):
+        '''Проверка: cached_url строит те же ссылки, что и встроенный url,
+        и повторно не обращается к резолверу.
+        '''
+        expected = self.render(LINKS)
+        cached = '{% load cached_url %}' + LINKS
+        self.assertEqual(self.render(cached), expected)
+        self.assertEqual(self.render(cached), expected)
+        info = cached_url.cached_reverse.cache_info()
+        # Несуществующий маршрут не кэшируется: NoReverseMatch.
+        self.assertEqual((info.hits, info.misses), (4, 6))
+
+    def test_script_prefix_is_part_of_key(self):
+        '''Проверка: ссылки под другим префиксом скрипта не смешиваются.'''
+        source = "{% load cached_url %}{% url 'posts:index' %}"
+        self.assertEqual(self.render(source), '/')
+        set_script_prefix('/yatube/')
+        try:
+            self.assertEqual(self.render(source), '/yatube/')
+        finally:
+            clear_script_prefix()
+
+    def test_cache_is_bounded_and_reset_on_setting_change(self):
+        '''Проверка: размер кэша берётся из URL_CACHE_SIZE.'''
+        with override_settings(URL_CACHE_SIZE=2):
+            self.render('{% load cached_url %}' + LINKS)
+            info = cached_url.cached_reverse.cache_info()
+            self.assertEqual((info.maxsize, info.currsize), (2, 2))
+        self.assertEqual(cached_url.cached_reverse.cache_info().maxsize, 4096)
@@ -0,0 +1,33 @@
+from unittest import skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from ..db import configure_sqlite, pragma_statements
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Прагмы есть только у SQLite')
+class SQLitePragmasTest(SimpleTestCase):
+    databases = {'default'}
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234,
+                                       'cache_size': -1000})
+    def test_pragmas_are_applied(self):
+        '''Проверка: новое соединение получает прагмы из настроек.'''
+        connection.ensure_connection()
+        configure_sqlite(sender=None, connection=connection)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+        self.assertEqual(self.pragma('cache_size'), -1000)
+
+    def test_invalid_pragma(self):
+        '''Проверка: прагма с посторонними символами не выполняется.'''
+        for pragmas in ({'cache_size; DROP': 1}, {'journal_mode': 'wal;'}):
+            with self.subTest(pragmas=pragmas):
+                with self.assertRaises(ImproperlyConfigured):
+                    pragma_statements(pragmas)
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.http import Http404
+from django.test import SimpleTestCase, override_settings
+
+from ..lookups import LookupCache, lookup_caches, lookup_stats
+
+
+class LookupCacheTest(SimpleTestCase):
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        self.loaded = []
+        self.lookup = LookupCache('test', self.load)
+        self.addCleanup(lookup_caches.pop, 'test')
+
+    def load(self, key):
+        self.loaded.append(key)
+        return {'known': 'значение'}.get(key)
+
+    def test_value_is_loaded_once(self):
+        '''Проверка: повторный поиск берёт значение из памяти процесса,
+        а после её сброса — из общего кэша.
+        '''
+        for _ in range(3):
+            self.assertEqual(self.lookup.get('known'), 'значение')
+        self.lookup.clear()
+        self.assertEqual(self.lookup.get('known'), 'значение')
+        self.assertEqual(self.loaded, ['known'])
+        stats = lookup_stats()['test']
+        self.assertEqual(
+            (stats['local_hits'], stats['shared_hits'], stats['misses']),
+            (0, 1, 0),
+        )
+
+    @override_settings(LOOKUP_LOCAL_TTL=0)
+    def test_missing_key_is_cached(self):
+        '''Проверка: отсутствующий ключ запоминается и отдаёт 404.'''
+        for _ in range(2):
+            with self.assertRaises(Http404):
+                self.lookup.get_or_404('missing')
+        self.assertEqual(self.loaded, ['missing'])
+        self.assertEqual(lookup_stats()['test']['hit_ratio'], 0.5)
+
+    def test_forget(self):
+        '''Проверка: сброшенный ключ загружается заново.'''
+        self.lookup.get('known')
+        self.lookup.forget('known')
+        self.lookup.get('known')
+        self.assertEqual(self.loaded, ['known', 'known'])
+
+    @override_settings(LOOKUP_LOCAL_SIZE=2)
+    def test_local_size_is_bounded(self):
+        '''Проверка: память процесса вытесняет давно не читанные ключи.'''
+        for key in ('known', 'first', 'second'):
+            self.lookup.get(key)
+        self.assertEqual(list(self.lookup._local), ['first', 'second'])
@@ -0,0 +1,71 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..metrics import registry
+
+User = get_user_model()
+
+
+class RequestMetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.staff = User.objects.create_user(username='admin', is_staff=True)
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        registry.reset()
+        self.guest_client = Client()
+
+    def test_request_is_measured(self):
+        '''Проверка: ответ несёт Server-Timing, лог — JSON со стоимостью
+        запроса, а сводка учитывает представление.
+        '''
+        with self.assertLogs('core.metrics', 'INFO') as logs:
+            response = self.guest_client.get(
+                reverse('posts:post_detail', args=(self.post.pk,))
+            )
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:post_detail')
+        self.assertEqual(record['bytes'], len(response.content))
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertLessEqual(len(record['slow_queries']), 3)
+        summary = registry.snapshot()['posts:post_detail']
+        self.assertEqual(summary['count'], 1)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self):
+        '''Проверка: запрос вне выборки не получает метрик.'''
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(registry.snapshot(), {})
+
+    def test_metrics_endpoint_is_staff_only(self):
+        '''Проверка: сводку видит только сотрудник.'''
+        url = reverse('core:request_metrics')
+        self.assertEqual(
+            self.guest_client.get(url).status_code, HTTPStatus.FOUND
+        )
+        self.guest_client.force_login(self.user)
+        self.assertEqual(
+            self.guest_client.get(url).status_code, HTTPStatus.FOUND
+        )
+        self.guest_client.force_login(self.staff)
+        self.guest_client.get(reverse('posts:index'))
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('posts:index', response.json()['views'])
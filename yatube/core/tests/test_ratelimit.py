@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from ..ratelimit import (
+    clear_rate_limits, client_ip, rate_limit_stats, refill, take_tokens,
+)
+
+
+@override_settings(RATELIMITS={
+    'login': {'ip': (100, 60), 'username': (2, 60)},
+    'signup': {'ip': (1, 600)},
+})
+class RateLimitTest(TestCase):
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        clear_rate_limits()
+        self.guest_client = Client()
+
+    def login(self, username):
+        return self.guest_client.post(
+            reverse('users:login'),
+            {'username': username, 'password': 'wrong-password'},
+        )
+
+    def test_login_is_limited_by_username(self):
+        '''Проверка: лишняя попытка входа под одним именем получает 429,
+        а другие имена входят как обычно.
+        '''
+        for _ in range(2):
+            self.assertEqual(self.login('Mokrushin').status_code, 200)
+        response = self.login('mokrushin')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(self.login('Another').status_code, 200)
+        self.assertEqual(
+            rate_limit_stats()['login'], {'allowed': 3, 'rejected': 1}
+        )
+
+    def test_signup_is_limited_by_ip(self):
+        '''Проверка: регистрация ограничена по IP, а просмотр формы —
+        нет.
+        '''
+        url = reverse('users:signup')
+        self.assertEqual(self.guest_client.post(url, {}).status_code, 200)
+        self.assertEqual(self.guest_client.post(url, {}).status_code, 429)
+        self.assertEqual(self.guest_client.get(url).status_code, 200)
+        other_client = Client(REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other_client.post(url, {}).status_code, 200)
+
+    @override_settings(
+        RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR',
+        RATELIMIT_TRUSTED_PROXIES=1,
+    )
+    def test_signup_behind_proxy_is_limited_by_client(self):
+        '''Проверка: за прокси клиенты с одним REMOTE_ADDR получают свои
+        корзины, а подставленный клиентом адрес не помогает.
+        '''
+        url = reverse('users:signup')
+        first = Client(HTTP_X_FORWARDED_FOR='10.0.0.2')
+        self.assertEqual(first.post(url, {}).status_code, 200)
+        spoofed = Client(HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.2')
+        self.assertEqual(spoofed.post(url, {}).status_code, 429)
+        second = Client(HTTP_X_FORWARDED_FOR='10.0.0.3')
+        self.assertEqual(second.post(url, {}).status_code, 200)
+
+    def test_client_ip(self):
+        '''Проверка: адрес клиента отсчитывается от конца заголовка по
+        числу доверенных прокси.
+        '''
+        request = RequestFactory().get(
+            '/', HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.2, 10.0.0.1'
+        )
+        cases = (
+            ('', 1, '127.0.0.1'),
+            ('HTTP_X_FORWARDED_FOR', 1, '10.0.0.1'),
+            ('HTTP_X_FORWARDED_FOR', 2, '10.0.0.2'),
+            ('HTTP_X_FORWARDED_FOR', 4, '127.0.0.1'),
+        )
+        for header, proxies, expected in cases:
+            with self.subTest(header=header, proxies=proxies):
+                with override_settings(
+                    RATELIMIT_IP_HEADER=header,
+                    RATELIMIT_TRUSTED_PROXIES=proxies,
+                ):
+                    self.assertEqual(client_ip(request), expected)
+
+    def test_memory_fallback(self):
+        '''Проверка: без кэша корзины хранятся в памяти процесса.'''
+        broken = mock.Mock()
+        broken.get_many.side_effect = ConnectionError
+        broken.set_many.side_effect = ConnectionError
+        with mock.patch('core.ratelimit.cache', broken):
+            with self.assertLogs('core.ratelimit', 'WARNING'):
+                self.assertEqual(take_tokens('signup', [('ip', 'a')]), 0)
+                self.assertGreater(take_tokens('signup', [('ip', 'a')]), 0)
+
+    def test_refill(self):
+        '''Проверка: корзина наполняется пропорционально времени, но не
+        сверх ёмкости.
+        '''
+        self.assertEqual(refill(None, 5, 60, 100), 5)
+        self.assertEqual(refill((0, 100), 5, 60, 112), 1)
+        self.assertEqual(refill((4, 100), 5, 60, 1000), 5)
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import router
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..db import backup_sqlite
+from ..routers import (
+    mark_replica_synced, read_primary_if_stale, replica_reads,
+    replica_synced_at,
+)
+
+User = get_user_model()
+
+
+@replica_reads
+def read_view(request, modified=None):
+    if modified is not None:
+        read_primary_if_stale(modified)
+    return HttpResponse(router.db_for_read(Post))
+
+
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        self.factory = RequestFactory()
+        directory = tempfile.mkdtemp()
+        self.synced_path = os.path.join(directory, 'replica.sqlite3.synced')
+        self.addCleanup(os.rmdir, directory)
+        patcher = mock.patch(
+            'core.routers.replica_synced_path',
+            return_value=self.synced_path,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def mark_synced(self, timestamp):
+        mark_replica_synced(timestamp)
+        self.addCleanup(os.remove, self.synced_path)
+
+    def read(self, method='get', modified=None, **cookies):
+        request = getattr(self.factory, method)('/')
+        request.COOKIES.update(cookies)
+        request.user = AnonymousUser()
+        return read_view(request, modified).content.decode()
+
+    def test_reads_go_to_synced_replica(self):
+        '''Проверка: чтения идут на реплику, только когда она снята и
+        посетитель ничего не записывал.
+        '''
+        self.assertEqual(self.read(), 'default')
+        self.mark_synced(time.time())
+        self.assertEqual(self.read(), 'replica')
+        self.assertEqual(self.read(method='post'), 'default')
+        self.assertEqual(self.read(primary_reads='1'), 'default')
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_stale_replica_is_skipped(self):
+        '''Проверка: данные, изменённые после снимка, читаются
+        с основной базы.
+        '''
+        synced_at = time.time()
+        self.mark_synced(synced_at)
+        self.assertEqual(self.read(modified=synced_at - 1), 'replica')
+        self.assertEqual(self.read(modified=synced_at + 1), 'default')
+
+    def test_sync_time_is_shared_through_file(self):
+        '''Проверка: время снимка читается из файла рядом с репликой,
+        а не из кэша процесса.
+        '''
+        self.assertIsNone(replica_synced_at())
+        synced_at = time.time()
+        self.mark_synced(synced_at)
+        cache.clear()
+        self.assertEqual(replica_synced_at(), synced_at)
+        with open(self.synced_path) as synced:
+            self.assertEqual(float(synced.read()), synced_at)
+
+    def test_writes_go_to_primary(self):
+        '''Проверка: запись идёт в основную базу, и после неё запрос
+        читает тоже её.
+        '''
+        self.mark_synced(time.time())
+
+        @replica_reads
+        def write_view(request):
+            before = router.db_for_read(Post)
+            written = router.db_for_write(Post)
+            return HttpResponse(
+                f'{before} {written} {router.db_for_read(Post)}'
+            )
+
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        self.assertEqual(
+            write_view(request).content.decode(), 'replica default default'
+        )
+
+    def test_backup_sqlite(self):
+        '''Проверка: копия базы содержит таблицы и строки источника.'''
+        source = sqlite3.connect(':memory:')
+        source.execute('CREATE TABLE post (text TEXT)')
+        source.execute("INSERT INTO post VALUES ('Тестовый пост')")
+        source.commit()
+        directory = tempfile.mkdtemp()
+        target_name = os.path.join(directory, 'replica.sqlite3')
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, target_name)
+        backup_sqlite(source, target_name)
+        source.close()
+        target = sqlite3.connect(target_name)
+        self.addCleanup(target.close)
+        self.assertEqual(
+            target.execute('SELECT text FROM post').fetchall(),
+            [('Тестовый пост',)],
+        )
+
+    def test_replicate_db_refuses_same_file(self):
+        '''Проверка: в тестах реплика совпадает с основной базой,
+        и команда её не перезаписывает.
+        '''
+        with self.assertRaises(CommandError):
+            call_command('replicate_db')
+
+
+class ReplicaPinTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_write_pins_author_to_primary(self):
+        '''Проверка: после создания поста автор получает cookie чтения
+        с основной базы, а простой просмотр её не ставит.
+        '''
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertNotIn('primary_reads', response.cookies)
+        response = self.authorized_client.post(
+            reverse('posts:post_create'), {'text': 'Тестовый пост'}
+        )
+        self.assertIn('primary_reads', response.cookies)
+        self.assertEqual(response.cookies['primary_reads']['max-age'], 10)
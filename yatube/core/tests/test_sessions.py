@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import RevokedSession
+
+User = get_user_model()
+
+
+class SessionEngineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+
+    def session_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        return [
+            query for query in context if 'django_session' in query['sql']
+        ]
+
+    def test_feed_does_not_read_session_table(self):
+        '''Проверка: лента вошедшего пользователя не читает
+        django_session ни с cached_db, ни с подписанной cookie.
+        '''
+        for engine in (
+            'django.contrib.sessions.backends.cached_db',
+            'core.signed_sessions',
+        ):
+            with self.subTest(engine=engine):
+                with override_settings(SESSION_ENGINE=engine):
+                    client = Client()
+                    client.force_login(self.user)
+                    self.assertEqual(
+                        self.session_queries(client, reverse('posts:index')),
+                        [],
+                    )
+
+    @override_settings(SESSION_ENGINE='core.signed_sessions')
+    def test_logout_revokes_signed_cookie(self):
+        '''Проверка: после выхода подписанная cookie сессии больше
+        не принимается.
+        '''
+        client = Client()
+        client.force_login(self.user)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+        client.get(reverse('users:logout'))
+        replayed = Client()
+        replayed.cookies[settings.SESSION_COOKIE_NAME] = cookie
+        response = replayed.get(reverse('posts:index'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    @override_settings(SESSION_ENGINE='core.signed_sessions')
+    def test_revocation_survives_cache_churn(self):
+        '''Проверка: отзыв не теряется, когда кэш вытесняет записи или
+        очищается.
+        '''
+        client = Client()
+        client.force_login(self.user)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+        client.get(reverse('users:logout'))
+        for number in range(1000):
+            cache.set(f'churn:{number}', number)
+        cache.clear()
+        replayed = Client()
+        replayed.cookies[settings.SESSION_COOKIE_NAME] = cookie
+        response = replayed.get(reverse('posts:index'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    @override_settings(SESSION_ENGINE='core.signed_sessions')
+    def test_unavailable_revocation_list_fails_closed(self):
+        '''Проверка: без доступа к списку отзыва сессия не принимается.'''
+        client = Client()
+        client.force_login(self.user)
+        with mock.patch.object(
+            RevokedSession.objects, 'using', side_effect=DatabaseError
+        ), self.assertLogs('core.signed_sessions', 'WARNING'):
+            response = client.get(reverse('posts:index'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    @override_settings(SESSION_ENGINE='core.signed_sessions')
+    def test_clear_expired_revocations(self):
+        '''Проверка: команда удаляет только истёкшие записи отзыва.'''
+        now = timezone.now()
+        RevokedSession.objects.create(
+            session_id='expired', expire_date=now - timedelta(days=1)
+        )
+        RevokedSession.objects.create(
+            session_id='active', expire_date=now + timedelta(days=1)
+        )
+        call_command('clear_expired_sessions', stdout=StringIO())
+        self.assertEqual(
+            list(RevokedSession.objects.values_list('pk', flat=True)),
+            ['active'],
+        )
+
+    def test_untouched_session_is_not_loaded(self):
+        '''Проверка: запрос, который не обращается к сессии,
+        не загружает и не сохраняет её.
+        '''
+        client = Client()
+        client.force_login(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse('posts:api_posts'))
+        self.assertFalse(response.wsgi_request.session.accessed)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(
+            [query for query in context if 'django_session' in query['sql']]
+        )
+
+    def test_clear_expired_sessions(self):
+        '''Проверка: команда пачками удаляет только истёкшие сессии.'''
+        now = timezone.now()
+        Session.objects.bulk_create(
+            Session(
+                session_key=f'expired{number}',
+                session_data='',
+                expire_date=now - timedelta(days=1),
+            )
+            for number in range(5)
+        )
+        Session.objects.create(
+            session_key='active',
+            session_data='',
+            expire_date=now + timedelta(days=1),
+        )
+        call_command(
+            'clear_expired_sessions', batch_size=2, stdout=StringIO()
+        )
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['active'],
+        )
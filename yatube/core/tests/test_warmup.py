@@ -0,0 +1,17 @@
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from yatube import settings_prod
+
+from ..warmup import warm_templates
+
+
+class WarmTemplatesTest(SimpleTestCase):
+    @override_settings(TEMPLATES=settings_prod.TEMPLATES)
+    def test_warm_templates_fills_cached_loader(self):
+        '''Проверка: прогрев компилирует все шаблоны в cached.Loader.'''
+        loaded, errors = warm_templates()
+        self.assertEqual(errors, [])
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertEqual(len(loader.get_template_cache), loaded)
+        self.assertIn('posts/index.html', loader.get_template_cache)
@@ -0,0 +1,21 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .lookups import lookup_stats
+from .metrics import registry
+from .ratelimit import rate_limit_stats
+
+
+@staff_member_required
+def request_metrics(request):
+    '''Сводка метрик запросов по представлениям, кэшей поиска и
+    ограничения попыток входа этого процесса.
+    '''
+    return JsonResponse(
+        {
+            'views': registry.snapshot(),
+            'lookups': lookup_stats(),
+            'rate_limits': rate_limit_stats(),
+        },
+        json_dumps_params={'ensure_ascii': False},
+    )
@@ -0,0 +1,50 @@
+'''Предварительная компиляция шаблонов.
+
+С cached.Loader шаблон разбирается один раз на процесс, при первом
+обращении. warm_templates() обходит каталоги шаблонов и загружает каждый
+шаблон заранее, чтобы первый запрос воркера не платил за разбор.
+'''
+import os
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def template_names(backend):
+    '''Имена всех шаблонов из DIRS и каталогов templates приложений.'''
+    dirs = list(backend.engine.dirs)
+    dirs.extend(get_app_template_dirs(backend.app_dirname))
+    names = set()
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.join(root, filename)
+                    names.add(
+                        os.path.relpath(path, directory).replace(os.sep, '/')
+                    )
+    return sorted(names)
+
+
+def warm_templates():
+    '''Компилирует все шаблоны движков Django.
+
+    Возвращает число загруженных шаблонов и список пар (имя, ошибка)
+    для шаблонов, которые не удалось разобрать.
+    '''
+    loaded = 0
+    errors = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend):
+            try:
+                backend.engine.get_template(name)
+            except TemplateSyntaxError as error:
+                errors.append((name, error))
+            else:
+                loaded += 1
+    return loaded, errors
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
+from .cache import page_cache_stats
 from .models import Group, Post
+from .search import search_posts
 
 
 @admin.register(Post)
@@ -17,5 +19,16 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        '''Ищет по полнотекстовому индексу вместо LIKE '%term%'.'''
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(pk__in=search_posts(search_term)), False
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context['page_cache_stats'] = page_cache_stats()
+        return super().changelist_view(request, extra_context)
+
 
 admin.site.register(Group)
@@ -0,0 +1,147 @@
+'''JSON API постов только для чтения.
+
+Списки отдаются страницами по keyset-курсору CursorPaginator:
+{"results": [...], "next": <адрес>, "previous": <адрес>}. Параметр
+fields выбирает поля постов через запятую, limit задаёт размер страницы
+до API_MAX_LIMIT. С format=ndjson список выгружается целиком, по посту
+в строке: StreamingHttpResponse читает выборку через
+QuerySet.iterator() и не держит её в памяти.
+'''
+from functools import wraps
+from http import HTTPStatus
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from .lookups import author_by_username, group_by_slug
+from .models import Post
+from .paginators import CursorPaginator
+
+# Поле ответа: (поле для values_list, значение у объекта Post).
+API_FIELDS = {
+    'id': ('id', attrgetter('pk')),
+    'text': ('text', attrgetter('text')),
+    'pub_date': ('pub_date', attrgetter('pub_date')),
+    'author': ('author__username', attrgetter('author.username')),
+    'group': ('group__slug', lambda post: post.group and post.group.slug),
+}
+
+
+class ApiError(Exception):
+    '''Ошибка в параметрах запроса: ответ 400 с текстом ошибки.'''
+
+
+def api_view(view):
+    '''GET-представление API: ошибки отдаются в JSON.'''
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            status, message = HTTPStatus.BAD_REQUEST, str(error)
+        except Http404:
+            status, message = HTTPStatus.NOT_FOUND, 'Not found.'
+        return json_response({'error': message}, status=status)
+    return wrapper
+
+
+def json_response(data, **kwargs):
+    return JsonResponse(
+        data, json_dumps_params={'ensure_ascii': False}, **kwargs
+    )
+
+
+def parse_fields(request):
+    fields = [
+        field for field in request.GET.get('fields', '').split(',') if field
+    ]
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown:
+        raise ApiError(f'Unknown fields: {", ".join(unknown)}.')
+    return fields or list(API_FIELDS)
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.NUM_POSTS))
+    except ValueError:
+        raise ApiError('limit must be an integer.')
+    if not 1 <= limit <= settings.API_MAX_LIMIT:
+        raise ApiError(f'limit must be from 1 to {settings.API_MAX_LIMIT}.')
+    return limit
+
+
+def serialize(post, fields):
+    return {field: API_FIELDS[field][1](post) for field in fields}
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params.pop('page', None)
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def stream_posts(posts, fields):
+    '''Строки NDJSON, собранные в куски по API_STREAM_CHUNK_SIZE постов.'''
+    chunk_size = settings.API_STREAM_CHUNK_SIZE
+    rows = posts.order_by('-pub_date', '-id').values_list(
+        *(API_FIELDS[field][0] for field in fields)
+    ).iterator(chunk_size=chunk_size)
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield ''.join(
+            encoder.encode(dict(zip(fields, row))) + '\n' for row in chunk
+        )
+
+
+def post_list(request, posts):
+    fields = parse_fields(request)
+    if request.GET.get('format') == 'ndjson':
+        return StreamingHttpResponse(
+            stream_posts(posts, fields),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+    paginator = CursorPaginator(posts.for_feed(), parse_limit(request))
+    cursor = request.GET.get('cursor')
+    page = paginator.get_cursor_page(cursor) if cursor else paginator.page(1)
+    return json_response({
+        'results': [serialize(post, fields) for post in page],
+        'next': page_url(request, page.next_cursor),
+        'previous': page_url(request, page.previous_cursor),
+    })
+
+
+@api_view
+def all_posts(request):
+    return post_list(request, Post.objects.all())
+
+
+@api_view
+def group_posts(request, slug):
+    group = group_by_slug.get_or_404(slug)
+    return post_list(request, Post.objects.filter(group=group))
+
+
+@api_view
+def author_posts(request, username):
+    author = author_by_username.get_or_404(username)
+    return post_list(request, Post.objects.filter(author=author))
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = parse_fields(request)
+    post = get_object_or_404(Post.objects.for_feed(), pk=post_id)
+    return json_response(serialize(post, fields))
@@ -0,0 +1,223 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+
+from core.routers import read_primary_if_stale
+
+from .models import Post
+
+POST_CARD_TEMPLATE = 'includes/post.html'
+
+
+def post_card_key(pk, pub_date):
+    return f'posts:card:{pk}:{pub_date:%Y%m%d%H%M%S%f}'
+
+
+def render_post_cards(posts):
+    '''Возвращает HTML карточек постов, отрисовывая только промахи кэша.'''
+    keys = [post_card_key(post.pk, post.pub_date) for post in posts]
+    cards = cache.get_many(keys)
+    missed = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missed[key] = render_to_string(POST_CARD_TEMPLATE, {'post': post})
+    if missed:
+        cache.set_many(missed, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missed)
+    return [mark_safe(cards[key]) for key in keys]
+
+
+def forget_post_card(post):
+    cache.delete(post_card_key(post.pk, post.pub_date))
+
+
+def forget_post_cards(posts):
+    '''Сбрасывает карточки постов из выборки Post.'''
+    cache.delete_many([
+        post_card_key(pk, pub_date)
+        for pk, pub_date in posts.values_list('pk', 'pub_date').iterator()
+    ])
+
+
+def forget_author_cards(author):
+    forget_post_cards(Post.objects.filter(author=author))
+
+
+def forget_group_cards(group):
+    forget_post_cards(Post.objects.filter(group=group))
+
+
+FEED_VERSION_KEY = 'posts:feed_version:{}'
+FEED_MODIFIED_KEY = 'posts:feed_modified:{}'
+FEED_EPOCH = 'epoch'
+PAGE_CACHE_HITS = 'posts:page_cache:hits'
+PAGE_CACHE_MISSES = 'posts:page_cache:misses'
+
+
+def _initial_version():
+    # Версия после вытеснения из кэша не должна совпасть со старой.
+    return time.time_ns()
+
+
+def get_feed_versions(feeds):
+    keys = [FEED_VERSION_KEY.format(feed) for feed in feeds]
+    versions = cache.get_many(keys)
+    missed = {key: _initial_version() for key in keys if key not in versions}
+    if missed:
+        cache.set_many(missed, None)
+        versions.update(missed)
+    return [versions[key] for key in keys]
+
+
+def bump_feed_versions(*feeds):
+    '''Делает устаревшими сохранённые страницы перечисленных лент.'''
+    for feed in feeds:
+        key = FEED_VERSION_KEY.format(feed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+    modified = time.time()
+    cache.set_many(
+        {FEED_MODIFIED_KEY.format(feed): modified for feed in feeds}, None
+    )
+
+
+def get_feed_validators(feeds):
+    '''Версии лент и время последнего изменения любой из них.
+
+    Время неизвестной ленты считается текущим и запоминается, как и
+    версия: иначе Last-Modified менялся бы с каждым запросом.
+    '''
+    versions = get_feed_versions(feeds)
+    keys = [FEED_MODIFIED_KEY.format(feed) for feed in feeds]
+    modified = cache.get_many(keys)
+    missed = {key: time.time() for key in keys if key not in modified}
+    if missed:
+        cache.set_many(missed, None)
+        modified.update(missed)
+    return versions, max(modified.values())
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def page_cache_stats():
+    stats = cache.get_many((PAGE_CACHE_HITS, PAGE_CACHE_MISSES))
+    hits = stats.get(PAGE_CACHE_HITS, 0)
+    misses = stats.get(PAGE_CACHE_MISSES, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else 0,
+    }
+
+
+def feed_names(feeds, request, kwargs):
+    '''Имена лент страницы по аргументам view.
+
+    feeds — шаблоны имён вроде 'group:{slug}' или одна функция
+    (request, **kwargs), которая возвращает имена лент либо None, если
+    объекта страницы нет. Для адресов 404 версии лент не заводятся:
+    иначе перебор адресов оставлял бы в кэше вечные ключи.
+    '''
+    if len(feeds) == 1 and callable(feeds[0]):
+        return feeds[0](request, **kwargs)
+    return [feed.format(**kwargs) for feed in feeds]
+
+
+def conditional_page(*feeds):
+    '''Отвечает 304 Not Modified, пока ленты страницы не менялись.
+
+    feeds — ленты страницы, как в feed_names. ETag
+    строится из версий лент, пользователя и адреса без отрисовки и
+    запросов к постам. Last-Modified отдаётся только гостям: страница
+    вошедшего пользователя зависит ещё и от него. Если ленты менялись
+    позже снимка реплики, запрос читает основную базу.
+    '''
+    def validators(request, **kwargs):
+        # condition() спрашивает ETag и Last-Modified по отдельности.
+        if not hasattr(request, '_feed_validators'):
+            names = feed_names(feeds, request, kwargs)
+            request._feed_validators = (
+                None if names is None
+                else get_feed_validators((FEED_EPOCH, *names))
+            )
+            # Реплика, снятая до изменения лент, отдала бы старую
+            # страницу под новым ETag.
+            state = request._feed_validators
+            read_primary_if_stale(None if state is None else state[1])
+        return request._feed_validators
+
+    def etag(request, *args, **kwargs):
+        state = validators(request, **kwargs)
+        if state is None:
+            return None
+        user_id = request.user.pk if request.user.is_authenticated else 0
+        raw = f'{user_id}:{request.get_full_path()}:{state[0]}'
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        state = validators(request, **kwargs)
+        if state is None or request.user.is_authenticated:
+            return None
+        return datetime.fromtimestamp(state[1], timezone.utc)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def cache_anonymous_page(*feeds):
+    '''Кэширует страницу ленты целиком для анонимных посетителей.
+
+    feeds — ленты страницы, как в feed_names; без лент страница не
+    кэшируется. Ключ страницы содержит версии лент и общей эпохи,
+    поэтому изменения постов сбрасывают её без ожидания таймаута.
+    '''
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            names = feed_names(feeds, request, kwargs)
+            if names is None:
+                return view(request, *args, **kwargs)
+            versions = get_feed_versions((FEED_EPOCH, *names))
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = 'posts:page:{}:{}:{}'.format(
+                view.__name__, path, ':'.join(map(str, versions))
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                _count(PAGE_CACHE_HITS)
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            _count(PAGE_CACHE_MISSES)
+            response = view(request, *args, **kwargs)
+            if (
+                response.status_code == HTTPStatus.OK
+                and not response.streaming
+                and not request.META.get('CSRF_COOKIE_USED')
+            ):
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    settings.FEED_PAGE_CACHE_TIMEOUT,
+                )
+            return response
+        return wrapper
+    return decorator
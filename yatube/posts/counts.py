@@ -0,0 +1,85 @@
+'''Число постов ленты для навигации паджинатора.
+
+Функции и объекты этого модуля передаются в CursorPaginator как count:
+каждый получает выборку ленты и возвращает число постов или None.
+Точный COUNT(*) по миллиону строк дороже самой страницы, поэтому
+большие ленты могут показывать оценку: из sqlite_stat1 (обновляется
+командой ANALYZE) или из кэша с ограниченным временем жизни. Оценка
+возвращается как Estimate, и навигация помечает номер последней
+страницы как приблизительный.
+'''
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+from .paginators import Estimate, bounded_count
+
+COUNT_KEY = 'posts:count:{}'
+
+
+def exact_count(queryset):
+    return queryset.count()
+
+
+def counter_count(value):
+    '''Готовое значение счётчика, например Group.posts_count.'''
+    return lambda queryset: value
+
+
+def sqlite_stat_count(queryset):
+    '''Число строк таблицы по статистике ANALYZE для выборки без
+    условий; None, если статистики нет.
+    '''
+    connection = connections[queryset.db]
+    if connection.vendor != 'sqlite' or queryset.query.where:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return int(row[0].split()[0]) if row else None
+
+
+class ApproximateCount:
+    '''Точное число для небольших лент и оценка для больших.
+
+    Ленту до threshold постов считает ограниченный COUNT(*). Для более
+    длинной берётся первая доступная оценка из estimates и хранится в
+    кэше timeout секунд: дольше этого число не отстаёт от оценки.
+    '''
+
+    def __init__(self, key, estimates=(sqlite_stat_count, exact_count),
+                 threshold=None, timeout=None):
+        self.key = COUNT_KEY.format(key)
+        self.estimates = estimates
+        self.threshold = threshold
+        self.timeout = timeout
+
+    def __call__(self, queryset):
+        # В кэше бывают только числа больших лент, поэтому попадание
+        # обходится без запросов к базе.
+        count = cache.get(self.key)
+        if count is not None:
+            return Estimate(count)
+        threshold = self.threshold
+        if threshold is None:
+            threshold = settings.PAGINATOR_APPROXIMATE_THRESHOLD
+        count = bounded_count(queryset, threshold)
+        if count is not None:
+            return count
+        for estimate in self.estimates:
+            count = estimate(queryset)
+            if count is not None:
+                # Оценка не может быть меньше того, что уже насчитано.
+                count = max(count, threshold + 1)
+                timeout = self.timeout
+                if timeout is None:
+                    timeout = settings.PAGINATOR_COUNT_CACHE_TIMEOUT
+                cache.set(self.key, count, timeout)
+                return Estimate(count)
+        return None
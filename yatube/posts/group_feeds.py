@@ -0,0 +1,272 @@
+'''Материализованные ленты групп в кэше.
+
+Для группы в кэше хранится список ключей (pub_date, id) её самых новых
+постов, не длиннее GROUP_FEED_LENGTH, от старых к новым. Ключи лежат в
+двух массивах целых чисел: такой список распаковывается из кэша в
+десятки раз быстрее списка пар с datetime. Страницы в
+пределах списка выбираются из него, и к базе остаётся запрос постов по
+первичному ключу; страницы глубже списка GroupFeedPaginator читает из
+базы обычным keyset-запросом.
+
+Список не правится на месте: при создании, правке, переносе и удалении
+постов сигналы увеличивают версию ленты группы, и следующее чтение
+загружает список заново. Версия хранится в кэше отдельно, а список
+помнит версию, с которой его загрузили. Так параллельные сохранения не
+теряют изменений друг друга, а список, прочитанный из базы до
+фиксации транзакции и записанный после, не примется: версию ещё раз
+увеличивает transaction.on_commit.
+
+Обращения к лентам считаются в кэше, а команда warm_group_feeds по этим
+счётчикам заранее загружает списки самых популярных групп.
+'''
+import math
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.db import transaction
+
+from .models import Group, Post
+from .paginators import CursorPaginator, InvalidCursor
+
+GROUP_FEED_KEY = 'posts:group_feed:{}'
+GROUP_FEED_HITS_KEY = 'posts:group_feed:hits:{}'
+GROUP_FEED_VERSION_KEY = 'posts:group_feed:version:{}'
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# stamps и ids — pub_date в микросекундах и id постов, от старых
+# к новым; complete — в списке все посты группы, а не только новые;
+# version — версия ленты, с которой список загружен.
+GroupFeed = namedtuple(
+    'GroupFeed', ('stamps', 'ids', 'complete', 'version')
+)
+
+
+def stamp(value):
+    '''pub_date в виде числа микросекунд от начала эпохи.'''
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // MICROSECOND
+
+
+def feed_position(feed, pub_date, pk, right=False):
+    '''Позиция ключа (pub_date, pk) в ленте, как у bisect.'''
+    value = stamp(pub_date)
+    low = bisect_left(feed.stamps, value)
+    high = bisect_right(feed.stamps, value, low)
+    if right:
+        return bisect_right(feed.ids, pk, low, high)
+    return bisect_left(feed.ids, pk, low, high)
+
+
+def group_feed_version(group_id):
+    '''Текущая версия ленты группы, при отсутствии — новая.'''
+    key = GROUP_FEED_VERSION_KEY.format(group_id)
+    # Версия после вытеснения из кэша не должна совпасть со старой.
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def load_group_feed(group_id, version=None):
+    '''Читает ключи самых новых постов группы и кладёт их в кэш.
+
+    version нужно узнать до чтения из базы: если лента изменится
+    раньше, чем список попадёт в кэш, версия уже не совпадёт.
+    '''
+    if version is None:
+        version = group_feed_version(group_id)
+    length = settings.GROUP_FEED_LENGTH
+    entries = list(
+        Post.objects.filter(group_id=group_id)
+        .order_by('-pub_date', '-id')
+        .values_list('pub_date', 'id')[:length]
+    )
+    entries.reverse()
+    feed = GroupFeed(
+        array('q', (stamp(pub_date) for pub_date, _ in entries)),
+        array('q', (pk for _, pk in entries)),
+        len(entries) < length,
+        version,
+    )
+    cache.set(
+        GROUP_FEED_KEY.format(group_id), feed,
+        settings.GROUP_FEED_CACHE_TIMEOUT,
+    )
+    return feed
+
+
+def get_group_feed(group_id):
+    '''Лента группы из кэша; при промахе или смене версии загружается
+    из базы.
+    '''
+    count_group_feed_hit(group_id)
+    key = GROUP_FEED_KEY.format(group_id)
+    version_key = GROUP_FEED_VERSION_KEY.format(group_id)
+    cached = cache.get_many((key, version_key))
+    version = cached.get(version_key)
+    if version is None:
+        version = group_feed_version(group_id)
+    feed = cached.get(key)
+    if feed is None or feed.version != version:
+        feed = load_group_feed(group_id, version)
+    return feed
+
+
+def count_group_feed_hit(group_id):
+    key = GROUP_FEED_HITS_KEY.format(group_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def forget_group_feeds(*group_ids, hits=False):
+    '''Делает устаревшими списки групп, с hits — сбрасывает и
+    счётчики обращений.
+    '''
+    group_ids = [pk for pk in group_ids if pk is not None]
+    for group_id in group_ids:
+        try:
+            cache.incr(GROUP_FEED_VERSION_KEY.format(group_id))
+        except ValueError:
+            # Версии нет: новая не совпадёт ни с одним списком.
+            pass
+    keys = (GROUP_FEED_KEY, GROUP_FEED_HITS_KEY) if hits else (
+        GROUP_FEED_KEY,
+    )
+    cache.delete_many([
+        key.format(group_id) for group_id in group_ids for key in keys
+    ])
+
+
+def forget_group_feeds_on_commit(*group_ids, hits=False):
+    '''Сбрасывает списки групп сейчас и ещё раз после фиксации
+    транзакции: список, загруженный до неё, устареет.
+    '''
+    forget_group_feeds(*group_ids, hits=hits)
+    transaction.on_commit(partial(forget_group_feeds, *group_ids))
+
+
+def hot_groups(top):
+    '''До top групп с наибольшим числом обращений: [(id, обращения)].'''
+    group_ids = Group.objects.values_list('pk', flat=True)
+    keys = {GROUP_FEED_HITS_KEY.format(pk): pk for pk in group_ids}
+    hits = cache.get_many(keys)
+    ranked = sorted(
+        ((keys[key], count) for key, count in hits.items() if count > 0),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return ranked[:top]
+
+
+def warm_group_feeds(top):
+    '''Загружает в кэш ленты top самых посещаемых групп.
+
+    Счётчики обращений затем делятся пополам, чтобы рейтинг следовал
+    за текущим трафиком, а не за накопленным. Возвращает прогретые
+    группы в виде [(id, обращения)].
+    '''
+    groups = hot_groups(top)
+    for group_id, _ in groups:
+        load_group_feed(group_id)
+    cache.set_many(
+        {
+            GROUP_FEED_HITS_KEY.format(group_id): count // 2
+            for group_id, count in groups
+        },
+        None,
+    )
+    return groups
+
+
+class GroupFeedPaginator(CursorPaginator):
+    '''Keyset-паджинатор ленты группы по кэшированному списку ключей.
+
+    feed — GroupFeed из get_group_feed(). Если страница не помещается в
+    список, она читается из базы, как в CursorPaginator.
+    '''
+
+    def __init__(self, object_list, per_page, feed, **kwargs):
+        self.feed = feed
+        super().__init__(object_list, per_page, **kwargs)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        stop = len(self.feed.ids) - (number - 1) * self.per_page
+        start = stop - self.per_page - 1
+        if start < 0 and not self.feed.complete:
+            return super().page(number)
+        window = self.feed.ids[max(start, 0):max(stop, 0)][::-1]
+        if not window and number > 1:
+            raise EmptyPage('That page contains no results')
+        return self.feed_page(window, number, has_previous=number > 1)
+
+    def last_page(self):
+        if not self.feed.complete:
+            return super().last_page()
+        # Полный список знает точное число постов группы.
+        ids = self.feed.ids
+        number = max(1, math.ceil(len(ids) / self.per_page))
+        size = len(ids) - (number - 1) * self.per_page or self.per_page
+        return self._get_page(
+            self.load_posts(ids[:size][::-1]),
+            number,
+            self,
+            has_previous=number > 1,
+            has_next=False,
+        )
+
+    def get_cursor_page(self, cursor):
+        try:
+            direction, skip, number, key = self.decode_cursor(cursor)
+        except InvalidCursor:
+            return self.page(1)
+        ids, complete = self.feed.ids, self.feed.complete
+        if direction == self.NEXT:
+            stop = feed_position(self.feed, *key) - skip * self.per_page
+            start = stop - self.per_page - 1
+            if start >= 0 or complete:
+                if stop <= 0:
+                    return self.last_page()
+                window = ids[max(start, 0):max(stop, 0)][::-1]
+                return self.feed_page(window, number, has_previous=True)
+        else:
+            position = feed_position(self.feed, *key, right=True)
+            # Неполный список знает все посты новее своего начала.
+            if position > 0 or complete:
+                start = position + skip * self.per_page
+                window = ids[start:start + self.per_page + 1]
+                if not window:
+                    return self.page(1)
+                has_previous = len(window) > self.per_page
+                return self._get_page(
+                    self.load_posts(window[:self.per_page][::-1]),
+                    max(number, 2) if has_previous else 1,
+                    self,
+                    has_previous=has_previous,
+                    has_next=True,
+                )
+        return super().get_cursor_page(cursor)
+
+    def feed_page(self, window, number, has_previous):
+        '''Страница по id постов window от новых к старым.'''
+        return self._get_page(
+            self.load_posts(window[:self.per_page]),
+            number,
+            self,
+            has_previous=has_previous,
+            has_next=len(window) > self.per_page,
+        )
+
+    def load_posts(self, ids):
+        posts = self.object_list.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
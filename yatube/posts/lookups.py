@@ -0,0 +1,32 @@
+'''Группы и авторы по ключам из адресов лент через core.lookups.'''
+from core.lookups import LookupCache
+
+from .models import Group, User
+
+# Поля автора, которые нужны профилю и ленте. Остальные (хэш пароля,
+# email, права) в общий кэш не попадают.
+AUTHOR_FIELDS = (
+    'username', 'first_name', 'last_name', 'stats__posts_count',
+)
+
+
+def load_group(slug):
+    try:
+        return Group.objects.get(slug=slug)
+    except Group.DoesNotExist:
+        return None
+
+
+def load_author(username):
+    try:
+        return (
+            User.objects.select_related('stats')
+            .only(*AUTHOR_FIELDS)
+            .get(username=username)
+        )
+    except User.DoesNotExist:
+        return None
+
+
+group_by_slug = LookupCache('group', load_group)
+author_by_username = LookupCache('author', load_author)
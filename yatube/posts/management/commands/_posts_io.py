@@ -0,0 +1,54 @@
+'''Общий формат файлов для import_posts и export_posts.
+
+Пост — это запись с полями text, pub_date (ISO 8601), author (username)
+и group (slug или пусто) в NDJSON или CSV. Здесь же общие помощники
+массовой загрузки постов.
+'''
+import os
+
+from django.db import connection
+from django.db.models import AutoField
+
+from posts.models import Post
+
+FIELDS = ('text', 'pub_date', 'author', 'group')
+FORMATS = ('ndjson', 'csv')
+
+
+def guess_format(path, default='ndjson'):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    if extension == 'jsonl':
+        return 'ndjson'
+    return extension if extension in FORMATS else default
+
+
+def insert_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if not isinstance(field, AutoField)
+    ]
+
+
+def bulk_batch_size(model, requested, using=connection):
+    '''Размер пачки bulk_create в пределах лимитов СУБД: Django 2.2 не
+    ограничивает явно заданный batch_size, и SQLite отвергает большие
+    INSERT.
+    '''
+    return max(
+        1, min(requested, using.ops.bulk_batch_size(insert_fields(model), []))
+    )
+
+
+def insert_posts(posts, batch_size):
+    '''Вставляет посты с их собственными pub_date.
+
+    bulk_create подставил бы текущее время: auto_now_add срабатывает и
+    на заданной дате. Вставка в режиме raw, как у loaddata, берёт
+    значения полей как есть; сигналы и счётчики не затрагиваются.
+    '''
+    fields = insert_fields(Post)
+    batch_size = bulk_batch_size(Post, batch_size)
+    for start in range(0, len(posts), batch_size):
+        Post.objects._insert(
+            posts[start:start + batch_size], fields=fields, raw=True
+        )
@@ -0,0 +1,50 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.search import SearchPaginator
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время первой страницы поиска через FTS5 '
+        'и через LIKE по текущей базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='+', help='Поисковые запросы')
+        parser.add_argument(
+            '--repeat', type=int, default=5, help='Повторов каждого запроса'
+        )
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        total = Post.objects.count()
+        self.stdout.write(f'Постов в базе: {total}')
+        self.stdout.write(f'{"запрос":<20} {"FTS5, мс":>10} {"LIKE, мс":>10}')
+        for query in options['queries']:
+            fts = self.measure(
+                lambda: list(
+                    SearchPaginator(query, settings.NUM_POSTS).get_page(1)
+                ),
+                options['repeat'],
+            )
+            like = self.measure(
+                lambda: list(
+                    Post.objects.for_feed()
+                    .filter(text__icontains=query)
+                    .order_by('-pub_date', '-id')[:settings.NUM_POSTS + 1]
+                ),
+                options['repeat'],
+            )
+            self.stdout.write(f'{query:<20} {fts:>10.1f} {like:>10.1f}')
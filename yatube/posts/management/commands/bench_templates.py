@@ -0,0 +1,74 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loader import render_to_string
+from django.template.loaders.cached import Loader as CachedLoader
+from django.test import RequestFactory
+
+from posts.models import Post
+from posts.paginators import CursorPaginator
+
+TEMPLATE = 'posts/index.html'
+
+
+def cached_loaders():
+    return [
+        loader
+        for backend in engines.all()
+        if isinstance(backend, DjangoTemplates)
+        for loader in backend.engine.template_loaders
+        if isinstance(loader, CachedLoader)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время отрисовки posts/index.html с холодным и '
+        'прогретым кэшем скомпилированных шаблонов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=50, help='Отрисовок в каждом режиме'
+        )
+
+    def render(self, request):
+        # Карточки постов кешируются отдельно; сбрасываем их, чтобы
+        # режимы отличались только разбором шаблонов.
+        cache.clear()
+        page_obj = CursorPaginator(
+            Post.objects.for_feed(), settings.NUM_POSTS
+        ).get_page(1)
+        started = time.perf_counter()
+        render_to_string(TEMPLATE, {'page_obj': page_obj}, request)
+        return (time.perf_counter() - started) * 1000
+
+    def handle(self, *args, **options):
+        loaders = cached_loaders()
+        if not loaders:
+            self.stderr.write(
+                'cached.Loader не настроен, шаблоны разбираются при каждой '
+                'отрисовке; запустите с --settings yatube.settings_prod'
+            )
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        cold = []
+        for _ in range(options['repeat']):
+            for loader in loaders:
+                loader.reset()
+            cold.append(self.render(request))
+        warm = [self.render(request) for _ in range(options['repeat'])]
+        self.stdout.write(
+            f'{"кэш шаблонов":<14} {"p50, мс":>9} {"max, мс":>9}'
+        )
+        for name, timings in (('холодный', cold), ('прогретый', warm)):
+            self.stdout.write(
+                f'{name:<14} {statistics.median(timings):>9.2f} '
+                f'{max(timings):>9.2f}'
+            )
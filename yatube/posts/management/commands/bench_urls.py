@@ -0,0 +1,62 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, engines
+
+from posts.models import Post
+
+# Ссылки страницы ленты: шапка для вошедшего пользователя и по три
+# ссылки на каждую карточку поста.
+PAGE_SOURCE = '''
+{% url 'posts:index' %}{% url 'about:author' %}{% url 'about:tech' %}
+{% url 'posts:search' %}{% url 'posts:post_create' %}
+{% url 'users:password_change' %}{% url 'users:logout' %}
+{% for post in posts %}
+{% url 'posts:profile' post.author %}
+{% url 'posts:post_detail' post.id %}
+{% if post.group %}{% url 'posts:group_list' post.group.slug %}{% endif %}
+{% endfor %}'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время построения ссылок страницы ленты встроенным '
+        'тегом url и тегом из cached_url'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=1000, help='Отрисовок страницы'
+        )
+
+    def measure(self, header, posts, repeat):
+        page = engines['django'].engine.from_string(header + PAGE_SOURCE)
+        context = Context({'posts': posts})
+        page.render(context)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            page.render(context)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        posts = list(
+            Post.objects.for_feed().order_by('-pub_date')[:settings.NUM_POSTS]
+        )
+        if not posts:
+            raise CommandError('В базе нет постов, запустите seed_bench')
+        builtin = self.measure('', posts, options['repeat'])
+        cached = self.measure(
+            '{% load cached_url %}', posts, options['repeat']
+        )
+        links = 7 + sum(2 + bool(post.group_id) for post in posts)
+        self.stdout.write(
+            f'Ссылок на странице: {links}\n'
+            f'url:        {builtin:8.1f} мкс на страницу\n'
+            f'cached_url: {cached:8.1f} мкс на страницу\n'
+            f'Экономия:   {builtin - cached:8.1f} мкс '
+            f'({(1 - cached / builtin) * 100:.0f}%)'
+        )
@@ -0,0 +1,200 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import AuthorStats, Group, Post
+from posts.paginators import CursorPaginator
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'queries', 'peak_kib')
+
+
+def percentile(timings, fraction):
+    '''Перцентиль по методу ближайшего ранга.'''
+    ordered = sorted(timings)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет ленты и страницу поста через тестовый клиент и '
+        'сохраняет перцентили времени, число запросов и пик памяти'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=50, help='Запросов на сценарий'
+        )
+        parser.add_argument(
+            '--depth',
+            type=int,
+            default=1000,
+            help='Номер страницы ленты для сценария глубокой страницы',
+        )
+        cache_mode = parser.add_mutually_exclusive_group()
+        cache_mode.add_argument(
+            '--cold',
+            dest='cold',
+            action='store_true',
+            default=True,
+            help='Очищать кеш перед каждым запросом (по умолчанию)',
+        )
+        cache_mode.add_argument(
+            '--warm',
+            dest='cold',
+            action='store_false',
+            help='Не очищать кеш: замеряются попадания в кеш страниц',
+        )
+        parser.add_argument('--output', help='Куда записать результаты JSON')
+        parser.add_argument(
+            '--baseline', help='JSON прошлого прогона для сравнения'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Допустимый относительный рост метрик относительно baseline',
+        )
+
+    def scenarios(self, depth):
+        '''URL сценариев: самые крупные группа и автор по счётчикам.'''
+        post = Post.objects.order_by('-pub_date', '-id').first()
+        if post is None:
+            raise CommandError('В базе нет постов, запустите seed_bench')
+        scenarios = {'index': reverse('posts:index')}
+        paginator = CursorPaginator(Post.objects.all(), settings.NUM_POSTS)
+        offset = (depth - 1) * settings.NUM_POSTS - 1
+        last = None
+        if offset >= 0:
+            last = paginator.object_list[offset:offset + 1].first()
+        if last is not None:
+            cursor = paginator.encode_cursor(
+                last, depth, CursorPaginator.NEXT
+            )
+            scenarios['index_deep'] = (
+                f'{reverse("posts:index")}?cursor={cursor}'
+            )
+        group = Group.objects.order_by('-posts_count').first()
+        if group is not None:
+            scenarios['group_posts'] = reverse(
+                'posts:group_list', args=(group.slug,)
+            )
+        stats = (
+            AuthorStats.objects.select_related('author')
+            .order_by('-posts_count').first()
+        )
+        author = stats.author if stats else post.author
+        scenarios['profile'] = reverse(
+            'posts:profile', args=(author.username,)
+        )
+        scenarios['post_detail'] = reverse(
+            'posts:post_detail', args=(post.pk,)
+        )
+        return scenarios
+
+    def measure(self, client, url, repeat, cold):
+        '''Время и запросы по repeat прогонам; пик памяти — отдельным
+        прогоном, чтобы tracemalloc не искажал время.
+        '''
+        timings = []
+        queries = 0
+        for _ in range(repeat + 1):
+            if cold:
+                cache.clear()
+            tracing = len(timings) == repeat
+            if tracing:
+                tracemalloc.start()
+            try:
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    elapsed = (time.perf_counter() - started) * 1000
+                if tracing:
+                    peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                if tracing:
+                    tracemalloc.stop()
+            if response.status_code != 200:
+                raise CommandError(f'{url} ответил {response.status_code}')
+            if not tracing:
+                timings.append(elapsed)
+                queries = max(queries, len(context))
+        return {
+            'url': url,
+            'cache': 'cold' if cold else 'warm',
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': queries,
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def compare(self, results, baseline, threshold):
+        '''Список метрик, выросших больше допустимого.'''
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            mode = previous.get('cache', 'cold')
+            if mode != result['cache']:
+                raise CommandError(
+                    f'{name}: baseline снят с кешем {mode}, '
+                    f'а прогон — с {result["cache"]}'
+                )
+            for metric in METRICS:
+                before, after = previous.get(metric), result[metric]
+                if before is None:
+                    continue
+                if after > before * (1 + threshold):
+                    regressions.append(
+                        f'{name}.{metric}: {before} -> {after}'
+                    )
+        return regressions
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть положительным')
+        client = Client()
+        results = {}
+        self.stdout.write(
+            'Кеш очищается перед каждым запросом' if options['cold']
+            else 'Тёплый кеш: время — попадания в кеш страниц'
+        )
+        self.stdout.write(
+            f'{"сценарий":<14} {"p50":>9} {"p95":>9} {"p99":>9} '
+            f'{"запросов":>9} {"КиБ":>9}'
+        )
+        for name, url in self.scenarios(options['depth']).items():
+            result = self.measure(
+                client, url, options['repeat'], options['cold']
+            )
+            results[name] = result
+            self.stdout.write(
+                f'{name:<14} {result["p50_ms"]:>9.2f} '
+                f'{result["p95_ms"]:>9.2f} {result["p99_ms"]:>9.2f} '
+                f'{result["queries"]:>9} {result["peak_kib"]:>9.1f}'
+            )
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                json.dump(results, target, ensure_ascii=False, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as source:
+                baseline = json.load(source)
+            regressions = self.compare(
+                results, baseline, options['threshold']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессия относительно baseline:\n'
+                    + '\n'.join(regressions)
+                )
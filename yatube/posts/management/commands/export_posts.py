@@ -0,0 +1,61 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+
+from ._posts_io import FIELDS, FORMATS, guess_format
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты в NDJSON или CSV потоком, не держа их в памяти'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки, «-» — stdout')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за раз',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or guess_format(path)
+        rows = (
+            Post.objects.order_by('pk')
+            .values_list('text', 'pub_date', 'author__username', 'group__slug')
+            .iterator(chunk_size=options['batch_size'])
+        )
+        started = time.perf_counter()
+        if path == '-':
+            exported = self.write(sys.stdout, rows, file_format)
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as output:
+                exported = self.write(output, rows, file_format)
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'Выгружено постов: {exported} за {elapsed:.1f} с '
+            f'({exported / max(elapsed, 1e-9):.0f} строк/с)'
+        )
+
+    def write(self, output, rows, file_format):
+        exported = 0
+        if file_format == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(FIELDS)
+        for text, pub_date, author, group in rows:
+            record = (text, pub_date.isoformat(), author, group or '')
+            if file_format == 'csv':
+                writer.writerow(record)
+            else:
+                output.write(
+                    json.dumps(dict(zip(FIELDS, record)), ensure_ascii=False)
+                    + '\n'
+                )
+            exported += 1
+        return exported
@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from posts.cache import FEED_EPOCH, bump_feed_versions
+from posts.group_feeds import forget_group_feeds
+from posts.models import Group, ImportProgress, Post, User
+
+from ._posts_io import FORMATS, guess_format, insert_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из NDJSON или CSV пачками INSERT. '
+        'Авторы и группы ищутся по username и slug, посты неизвестных '
+        'авторов пропускаются, неизвестная группа не проставляется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Строк в одном INSERT',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=20000,
+            help='Строк в одной транзакции',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить с записи, на которой прервалась загрузка',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or guess_format(path)
+        # Прогресс пишется в базу в транзакции пачки: после сбоя
+        # --resume не повторит уже вставленные посты.
+        progress = ImportProgress(path=os.path.abspath(path))
+        if options['resume']:
+            progress.records = (
+                ImportProgress.objects.filter(pk=progress.pk)
+                .values_list('records', flat=True)
+                .first()
+            ) or 0
+        done = progress.records
+        self.authors = dict(
+            User.objects.values_list('username', 'pk').iterator()
+        )
+        self.groups = dict(Group.objects.values_list('slug', 'pk').iterator())
+        imported = skipped = 0
+        started = time.perf_counter()
+        with open(path, encoding='utf-8', newline='') as source:
+            records = islice(self.read(source, file_format), done, None)
+            while True:
+                chunk = list(islice(records, options['chunk_size']))
+                if not chunk:
+                    break
+                posts = [
+                    post for post in (
+                        self.build(number, record) for number, record in chunk
+                    )
+                    if post is not None
+                ]
+                done += len(chunk)
+                progress.records = done
+                with transaction.atomic():
+                    insert_posts(posts, options['batch_size'])
+                    progress.save()
+                imported += len(posts)
+                skipped += len(chunk) - len(posts)
+                self.report(imported, skipped, started)
+        ImportProgress.objects.filter(pk=progress.pk).delete()
+        call_command('rebuild_post_counters', stdout=self.stdout)
+        forget_group_feeds(*Group.objects.values_list('pk', flat=True))
+        bump_feed_versions(FEED_EPOCH)
+        self.report(imported, skipped, started)
+
+    def read(self, source, file_format):
+        '''Нумерованные записи файла; номер нужен для сообщений об ошибках.'''
+        if file_format == 'csv':
+            return enumerate(csv.DictReader(source), start=2)
+        return (
+            (number, self.parse_json(number, line))
+            for number, line in enumerate(source, start=1)
+            if line.strip()
+        )
+
+    def parse_json(self, number, line):
+        try:
+            return json.loads(line)
+        except ValueError as error:
+            raise CommandError(f'Строка {number}: {error}')
+
+    def build(self, number, record):
+        author_id = self.authors.get(record.get('author'))
+        if author_id is None:
+            return None
+        group = record.get('group') or None
+        try:
+            pub_date = record.get('pub_date')
+            return Post(
+                text=record['text'],
+                author_id=author_id,
+                group_id=self.groups.get(group) if group else None,
+                pub_date=(
+                    datetime.fromisoformat(pub_date) if pub_date
+                    else timezone.now()
+                ),
+            )
+        except (KeyError, TypeError, ValueError) as error:
+            raise CommandError(f'Строка {number}: {error!r}')
+
+    def report(self, imported, skipped, started):
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'Загружено: {imported}, пропущено без автора: {skipped}, '
+            f'{imported / max(elapsed, 1e-9):.0f} строк/с'
+        )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import AuthorStats, Group, Post
+
+from ._posts_io import bulk_batch_size
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов авторов и групп по таблице постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пачки при записи счётчиков авторов',
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        author_counts = (
+            Post.objects.order_by()
+            .values_list('author')
+            .annotate(posts_count=Count('pk'))
+        )
+        AuthorStats.objects.all().delete()
+        AuthorStats.objects.bulk_create(
+            (
+                AuthorStats(author_id=author_id, posts_count=posts_count)
+                for author_id, posts_count in author_counts.iterator()
+            ),
+            batch_size=bulk_batch_size(AuthorStats, options['batch_size']),
+        )
+        group_counts = (
+            Post.objects.filter(group=OuterRef('pk'))
+            .order_by()
+            .values('group')
+            .annotate(posts_count=Count('pk'))
+            .values('posts_count')
+        )
+        groups = Group.objects.update(
+            posts_count=Coalesce(
+                Subquery(group_counts, output_field=IntegerField()), 0
+            )
+        )
+        self.stdout.write(
+            f'Счётчики пересчитаны: авторов {AuthorStats.objects.count()}, '
+            f'групп {groups}'
+        )
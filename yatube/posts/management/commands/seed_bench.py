@@ -0,0 +1,143 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from posts.cache import FEED_EPOCH, bump_feed_versions
+from posts.group_feeds import forget_group_feeds
+from posts.models import Group, Post, User
+from posts.search import drop_search_triggers, install_search_index
+
+from ._posts_io import bulk_batch_size, insert_posts
+
+WORDS = (
+    'город', 'река', 'утро', 'вечер', 'кот', 'собака', 'книга', 'музыка',
+    'дорога', 'поезд', 'море', 'лес', 'друг', 'работа', 'код', 'чай',
+    'кофе', 'снег', 'дождь', 'солнце', 'фильм', 'игра', 'школа', 'дом',
+    'окно', 'сад', 'праздник', 'новость', 'мост', 'гора', 'озеро', 'ветер',
+)
+
+
+def zipf_weights(size, exponent):
+    '''Накопленные веса закона Ципфа: k-й элемент встречается
+    пропорционально 1 / k ** exponent.
+    '''
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, группами и постами '
+        'с распределением Ципфа для нагрузочных замеров'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--groups', type=int, default=1_000)
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument(
+            '--exponent',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа для авторов и групп',
+        )
+        parser.add_argument(
+            '--without-group',
+            type=float,
+            default=0.2,
+            help='Доля постов без группы',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10_000,
+            help='Постов в одной транзакции',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+        prefix = f'bench{int(time.time())}'
+        password = make_password(None)
+        User.objects.bulk_create(
+            (
+                User(username=f'{prefix}_{number}', password=password)
+                for number in range(options['users'])
+            ),
+            batch_size=bulk_batch_size(User, batch_size),
+        )
+        Group.objects.bulk_create(
+            (
+                Group(
+                    title=f'Группа {number}',
+                    slug=f'{prefix}-{number}',
+                    description='Группа для нагрузочных замеров',
+                )
+                for number in range(options['groups'])
+            ),
+            batch_size=bulk_batch_size(Group, batch_size),
+        )
+        author_ids = list(
+            User.objects.filter(username__startswith=f'{prefix}_')
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        group_ids = list(
+            Group.objects.filter(slug__startswith=f'{prefix}-')
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        author_weights = zipf_weights(len(author_ids), options['exponent'])
+        group_weights = zipf_weights(len(group_ids), options['exponent'])
+        pub_date = timezone.now() - timedelta(days=365)
+        step = timedelta(days=365) / max(options['posts'], 1)
+        drop_search_triggers(connection)
+        try:
+            for start in range(0, options['posts'], batch_size):
+                size = min(batch_size, options['posts'] - start)
+                authors = rng.choices(
+                    author_ids, cum_weights=author_weights, k=size
+                )
+                groups = rng.choices(
+                    group_ids, cum_weights=group_weights, k=size
+                )
+                posts = []
+                for author_id, group_id in zip(authors, groups):
+                    pub_date += step
+                    posts.append(Post(
+                        author_id=author_id,
+                        group_id=(
+                            None if rng.random() < options['without_group']
+                            else group_id
+                        ),
+                        text=' '.join(rng.choices(
+                            WORDS, k=rng.randint(5, 60)
+                        )).capitalize(),
+                        pub_date=pub_date,
+                    ))
+                with transaction.atomic():
+                    insert_posts(posts, batch_size)
+                self.stderr.write(
+                    f'Постов: {start + size} из {options["posts"]}',
+                    ending='\r',
+                )
+        finally:
+            # Индекс поиска нужен и после прерванной загрузки.
+            install_search_index(connection, rebuild=True)
+        self.stderr.write('')
+        call_command('rebuild_post_counters', stdout=self.stdout)
+        forget_group_feeds(*Group.objects.values_list('pk', flat=True))
+        bump_feed_versions(FEED_EPOCH)
+        self.stdout.write(
+            f'Создано пользователей: {len(author_ids)}, групп: '
+            f'{len(group_ids)}, постов: {options["posts"]} за '
+            f'{time.perf_counter() - started:.1f} с'
+        )
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.group_feeds import warm_group_feeds
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает в кэш ленты самых посещаемых групп; с --interval '
+        'повторяет прогрев в фоне'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=100, help='Сколько групп прогревать'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Пауза между прогревами в секундах; 0 — один прогрев',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            groups = warm_group_feeds(options['top'])
+            self.stdout.write(f'Прогрето лент групп: {len(groups)}')
+            if options['interval'] <= 0:
+                return
+            time.sleep(options['interval'])
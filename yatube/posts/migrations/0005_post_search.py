@@ -0,0 +1,24 @@
+# Generated by Django 2.2.19 on 2026-10-18 05:02
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from posts.search import install_search_index
+    install_search_index(schema_editor.connection, rebuild=True)
+
+
+def drop_search_index(apps, schema_editor):
+    from posts.search import drop_search_index
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.19 on 2026-10-18 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportProgress',
+            fields=[
+                ('path', models.CharField(max_length=1024, primary_key=True, serialize=False, verbose_name='Файл')),
+                ('records', models.PositiveIntegerField(default=0, verbose_name='Загружено записей')),
+            ],
+            options={
+                'verbose_name': 'Загрузка постов',
+                'verbose_name_plural': 'Загрузки постов',
+            },
+        ),
+    ]
@@ -4,6 +4,23 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        '''Выборка для лент: автор и группа одним запросом и только
+        те поля, которые выводит карточка поста.
+        '''
+        return self.select_related('author', 'group').only(
+            'text',
+            'pub_date',
+            'author',
+            'author__username',
+            'author__first_name',
+            'author__last_name',
+            'group',
+            'group__slug',
+        )
+
+
 class Post(models.Model):
     SYMBOL_POST_QUANTITY = 15
     text = models.TextField(
@@ -28,10 +45,23 @@ class Post(models.Model):
         help_text='Группа, к которой будет относиться пост',
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = 'Посты'
         verbose_name = 'Пост'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('-pub_date', '-id'), name='post_feed_idx'),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_feed_idx',
+            ),
+        )
 
     def __str__(self):
         '''Возвращает строковое представление модели'''
@@ -46,6 +76,9 @@ class Group(models.Model):
     )
     slug = models.SlugField(unique=True, verbose_name='Слаг')
     description = models.TextField(verbose_name='Описание')
+    posts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество постов'
+    )
 
     class Meta:
         verbose_name_plural = 'Группы'
@@ -54,3 +87,47 @@ class Group(models.Model):
     def __str__(self):
         '''Возвращает строковое представление модели'''
         return self.title
+
+
+class AuthorStats(models.Model):
+    '''Счётчики автора, которые поддерживаются сигналами модели Post.'''
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество постов'
+    )
+
+    class Meta:
+        verbose_name_plural = 'Статистика авторов'
+        verbose_name = 'Статистика автора'
+
+    def __str__(self):
+        '''Возвращает строковое представление модели'''
+        return f'{self.author}: {self.posts_count}'
+
+
+class ImportProgress(models.Model):
+    '''Сколько записей файла загрузил import_posts (см. --resume).
+
+    Строка обновляется в одной транзакции со вставкой постов, поэтому
+    после сбоя число записей совпадает с загруженными постами.
+    '''
+    path = models.CharField(
+        max_length=1024, primary_key=True, verbose_name='Файл'
+    )
+    records = models.PositiveIntegerField(
+        default=0, verbose_name='Загружено записей'
+    )
+
+    class Meta:
+        verbose_name_plural = 'Загрузки постов'
+        verbose_name = 'Загрузка постов'
+
+    def __str__(self):
+        '''Возвращает строковое представление модели'''
+        return f'{self.path}: {self.records}'
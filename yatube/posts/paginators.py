@@ -0,0 +1,413 @@
+import base64
+import binascii
+import math
+from collections import namedtuple
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import (
+    EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator,
+)
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+# Наибольшее целое SQLite: больший id или OFFSET база не примет.
+MAX_INTEGER = 2 ** 63 - 1
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class Estimate(int):
+    '''Оценка числа объектов: реальное число может быть и меньше.'''
+
+
+# Ссылка окна навигации: query — параметр адреса (None у текущей
+# страницы и пропуска), approximate — номер посчитан по оценке.
+PageLink = namedtuple('PageLink', ('number', 'query', 'approximate'))
+
+
+def bounded_count(queryset, limit):
+    '''Число объектов выборки или None, если их больше limit.'''
+    count = queryset.order_by()[:limit + 1].count()
+    return None if count > limit else count
+
+
+class CursorPage(Page):
+    '''Страница keyset-паджинатора.
+
+    Наличие соседних страниц определяется по лишней записи выборки,
+    поэтому странице не нужно знать общее количество объектов.
+    '''
+
+    def __init__(self, object_list, number, paginator,
+                 has_previous=False, has_next=False):
+        super().__init__(object_list, number, paginator)
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return '<CursorPage %s>' % self.number
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def start_index(self):
+        if not self:
+            return 0
+        return (self.paginator.per_page * (self.number - 1)) + 1
+
+    def end_index(self):
+        if not self:
+            return 0
+        return self.start_index() + len(self) - 1
+
+    @cached_property
+    def page_window(self):
+        '''Номера страниц для навигации: первая, последняя и window
+        страниц по обе стороны от текущей; None — пропуск.
+
+        Если число объектов неизвестно (например, больше count_limit),
+        последней страницы нет, а окно ограничено страницами, которые
+        точно существуют.
+        '''
+        paginator = self.paginator
+        last = top = self.last_number
+        if last is None:
+            top = math.ceil(
+                ((paginator.count_limit or 0) + 1) / paginator.per_page
+            )
+        # Счётчики могут отставать от таблицы: текущая и следующая
+        # страницы существуют всегда.
+        top = max(top, self.number + self.has_next())
+        start = max(1, self.number - paginator.window)
+        end = min(top, self.number + paginator.window)
+        window = []
+        if start > 1:
+            window.append(1)
+            if start > 2:
+                window.append(None)
+        window.extend(range(start, end + 1))
+        if last is None:
+            if self.has_next() or end < top:
+                window.append(None)
+        elif end < last:
+            if end < last - 1:
+                window.append(None)
+            window.append(last)
+        return window
+
+    @cached_property
+    def last_number(self):
+        '''Номер последней страницы или None, если число объектов
+        неизвестно.
+        '''
+        count = self.paginator.known_count
+        if count is None:
+            return None
+        return max(1, math.ceil(count / self.paginator.per_page))
+
+    @cached_property
+    def page_links(self):
+        '''Окно навигации со ссылками PageLink.
+
+        Номер None — пропуск. Первая страница открывается по ?page=1,
+        страницы окна — курсором от края текущей с пропуском
+        промежуточных страниц, последняя за окном — по ?page=last
+        обратным keyset-запросом. Так ни одна ссылка не ведёт к OFFSET
+        по всей ленте.
+
+        Если число объектов — оценка (Estimate), номер последней
+        страницы помечается как приблизительный: страниц может быть
+        меньше. Курсор или ?page=last за концом ленты всё равно откроет
+        настоящую последнюю страницу.
+        '''
+        paginator = self.paginator
+        estimated = isinstance(paginator.known_count, Estimate)
+        links = []
+        for number in self.page_window:
+            if number is None or number == self.number:
+                query = None
+            elif number == 1:
+                query = 'page=1'
+            elif not self:
+                # Курсор не от чего строить: лента пуста или короче,
+                # чем обещал счётчик.
+                query = f'page={CursorPaginator.LAST}'
+            elif number < self.number:
+                query = 'cursor=' + paginator.encode_cursor(
+                    self[0], number, CursorPaginator.PREVIOUS,
+                    skip=self.number - number - 1,
+                )
+            elif number - self.number <= paginator.window:
+                query = 'cursor=' + paginator.encode_cursor(
+                    self[-1], number, CursorPaginator.NEXT,
+                    skip=number - self.number - 1,
+                )
+            else:
+                query = f'page={CursorPaginator.LAST}'
+            links.append(PageLink(
+                number, query, estimated and number == self.last_number
+            ))
+        return links
+
+    @property
+    def next_cursor(self):
+        '''Токен следующей (более старой) страницы.'''
+        if not self or not self.has_next():
+            return None
+        return self.paginator.encode_cursor(
+            self[-1], self.number + 1, CursorPaginator.NEXT
+        )
+
+    @property
+    def previous_cursor(self):
+        '''Токен предыдущей (более новой) страницы.'''
+        if not self or not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(
+            self[0], self.number - 1, CursorPaginator.PREVIOUS
+        )
+
+
+class CursorPaginator(Paginator):
+    '''Keyset-паджинатор по паре полей (pub_date, id), от новых к старым.
+
+    Страница выбирается условием по ключу последней записи предыдущей
+    страницы вместо OFFSET, а непрозрачный токен ?cursor= хранит этот
+    ключ. Условие записано как диапазон по pub_date, чтобы база искала
+    начало страницы по индексу. Курсор может пропускать до window - 1
+    страниц после ключа: так ссылки окна навигации обходятся без
+    OFFSET по всей ленте. Номера страниц ?page=N и ?page=last
+    поддерживаются для ссылок извне.
+
+    Для окна навигации нужно число объектов. count — готовое число или
+    функция от выборки (см. posts.counts), которая может вернуть None,
+    если число неизвестно. Без count объекты считаются не дальше
+    count_limit записей.
+    '''
+    NEXT = 'n'
+    PREVIOUS = 'p'
+    LAST = 'last'
+
+    def __init__(self, object_list, per_page, key_fields=('pub_date', 'id'),
+                 count=None, count_limit=None, window=2, **kwargs):
+        self.key_fields = key_fields
+        self.count_hint = count
+        self.count_limit = count_limit
+        self.window = window
+        date_field, id_field = key_fields
+        super().__init__(
+            object_list.order_by(f'-{date_field}', f'-{id_field}'),
+            per_page,
+            **kwargs,
+        )
+
+    @cached_property
+    def known_count(self):
+        '''Число объектов для навигации или None, если оно неизвестно.'''
+        if callable(self.count_hint):
+            return self.count_hint(self.object_list)
+        if self.count_hint is not None:
+            return self.count_hint
+        if self.count_limit is None:
+            return self.count
+        count = bounded_count(self.object_list, self.count_limit)
+        if count is not None:
+            self.count = count
+        return count
+
+    def validate_number(self, number):
+        '''Проверяет номер страницы, не обращаясь к COUNT(*).'''
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        if number > 1:
+            # Страница за концом ленты — последняя, и OFFSET по всей
+            # ленте для неё не нужен.
+            count = self.known_count
+            bottom = (number - 1) * self.per_page
+            if bottom > MAX_INTEGER - self.per_page or (
+                count is not None and bottom >= count
+            ):
+                raise EmptyPage('That page contains no results')
+        return number
+
+    def get_page(self, number):
+        '''Страница по номеру из адреса, как у Paginator.get_page:
+        нечисловой номер открывает первую страницу, номер за концом
+        ленты и LAST — последнюю.
+        '''
+        if number == self.LAST:
+            return self.last_page()
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            return self.last_page()
+
+    def page(self, number):
+        '''Страница по номеру: запасной путь для ссылок вида ?page=N.'''
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(
+            self.object_list[bottom:bottom + self.per_page + 1]
+        )
+        if not object_list and number > 1:
+            raise EmptyPage('That page contains no results')
+        return self._get_page(
+            object_list[:self.per_page],
+            number,
+            self,
+            has_previous=number > 1,
+            has_next=len(object_list) > self.per_page,
+        )
+
+    def last_page_size(self):
+        '''Номер последней страницы и число объектов на ней.
+
+        Если число объектов неизвестно, считается точный COUNT(*).
+        '''
+        count = self.known_count
+        if count is None:
+            count = self.count
+        number = max(1, math.ceil(count / self.per_page))
+        size = count - (number - 1) * self.per_page
+        return number, size if 0 < size <= self.per_page else self.per_page
+
+    def last_page(self):
+        '''Самая старая страница обратным keyset-запросом, без OFFSET.'''
+        number, size = self.last_page_size()
+        object_list = list(self.object_list.reverse()[:size + 1])
+        return self.reversed_last_page(object_list, number, size)
+
+    def reversed_last_page(self, object_list, number, size):
+        '''Последняя страница по size + 1 объектам от старых к новым.
+
+        Счётчик или оценка числа объектов может разойтись с таблицей:
+        тогда у страницы лишь другой номер, а если предыдущих нет —
+        она первая.
+        '''
+        has_previous = len(object_list) > size
+        return self._get_page(
+            object_list[:size][::-1],
+            max(number, 2) if has_previous else 1,
+            self,
+            has_previous=has_previous,
+            has_next=False,
+        )
+
+    def get_cursor_page(self, cursor):
+        '''Возвращает страницу по токену, при ошибке — первую страницу.
+
+        Если по токену записей не нашлось (лента стала короче или
+        записи удалены), открывается последняя или первая страница.
+        '''
+        try:
+            direction, skip, number, key = self.decode_cursor(cursor)
+        except InvalidCursor:
+            return self.page(1)
+        date_field, id_field = self.key_fields
+        pub_date, pk = key
+        bottom = skip * self.per_page
+        top = bottom + self.per_page + 1
+        if direction == self.NEXT:
+            boundary = Q(**{f'{date_field}__lte': pub_date}) & (
+                Q(**{f'{date_field}__lt': pub_date})
+                | Q(**{f'{id_field}__lt': pk})
+            )
+            object_list = list(self.object_list.filter(boundary)[bottom:top])
+            if not object_list:
+                return self.last_page()
+            return self._get_page(
+                object_list[:self.per_page],
+                number,
+                self,
+                has_previous=True,
+                has_next=len(object_list) > self.per_page,
+            )
+        boundary = Q(**{f'{date_field}__gte': pub_date}) & (
+            Q(**{f'{date_field}__gt': pub_date})
+            | Q(**{f'{id_field}__gt': pk})
+        )
+        object_list = list(
+            self.object_list.filter(boundary).reverse()[bottom:top]
+        )
+        if not object_list:
+            return self.page(1)
+        has_previous = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page][::-1]
+        return self._get_page(
+            object_list,
+            max(number, 2) if has_previous else 1,
+            self,
+            has_previous=has_previous,
+            has_next=True,
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return CursorPage(*args, **kwargs)
+
+    def cursor_key(self, obj):
+        '''Значения ключа записи в виде строк для токена.'''
+        date_field, id_field = self.key_fields
+        return (
+            getattr(obj, date_field).isoformat(),
+            str(getattr(obj, id_field)),
+        )
+
+    def parse_cursor_key(self, values):
+        '''Ключ из токена; ValueError, если полям его не сравнить.'''
+        pub_date, pk = values
+        pub_date, pk = datetime.fromisoformat(pub_date), int(pk)
+        if (pub_date.tzinfo is not None) != settings.USE_TZ:
+            raise ValueError('Cursor date does not match USE_TZ')
+        if not 0 < pk <= MAX_INTEGER:
+            raise ValueError('Cursor id is out of range')
+        return pub_date, pk
+
+    def encode_cursor(self, obj, number, direction, skip=0):
+        '''Токен страницы number в направлении direction от obj через
+        skip страниц.
+        '''
+        raw = '|'.join((
+            f'{direction}{skip or ""}', str(number), *self.cursor_key(obj)
+        ))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        '''Направление, пропуск страниц, номер страницы и ключ токена.'''
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            direction, number, *values = raw.split('|')
+            direction, skip = direction[:1], int(direction[1:] or 0)
+            number = int(number)
+            key = self.parse_cursor_key(values)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidCursor('Invalid cursor')
+        # Пропуск ограничен окном, чтобы токен не заменял OFFSET.
+        if (
+            direction not in (self.NEXT, self.PREVIOUS)
+            or not 0 <= skip < max(self.window, 1)
+            or number < 1
+        ):
+            raise InvalidCursor('Invalid cursor')
+        return direction, skip, number, key
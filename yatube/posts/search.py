@@ -0,0 +1,244 @@
+'''Полнотекстовый поиск по постам.
+
+В SQLite посты индексирует виртуальная таблица FTS5 с внешним содержимым
+posts_post, синхронизацию выполняют триггеры. Миграции SQLite пересоздают
+изменяемую таблицу вместе с её триггерами, поэтому они восстанавливаются
+после каждого migrate (см. PostsConfig.ready). На других СУБД поиск
+работает через icontains.
+'''
+import math
+import re
+
+from django.core.paginator import EmptyPage
+from django.db import connection
+
+from .models import Post
+from .paginators import MAX_INTEGER, CursorPaginator, InvalidCursor
+
+FTS_TABLE = 'posts_post_fts'
+
+CREATE_FTS_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "text, content='posts_post', content_rowid='id', "
+    "tokenize='unicode61')"
+)
+CREATE_TRIGGERS_SQL = (
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END''',
+)
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+WORD = re.compile(r'\w+')
+
+
+def fts_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_search_index(using=connection, rebuild=False):
+    '''Создаёт таблицу FTS5 и триггеры, если их нет.'''
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(CREATE_FTS_SQL)
+        for sql in CREATE_TRIGGERS_SQL:
+            cursor.execute(sql)
+        if rebuild:
+            cursor.execute(REBUILD_SQL)
+
+
+def restore_search_triggers(using=connection):
+    '''Возвращает триггеры, если таблица FTS5 уже создана миграцией.'''
+    if (
+        fts_available(using)
+        and FTS_TABLE in using.introspection.table_names()
+    ):
+        with using.cursor() as cursor:
+            for sql in CREATE_TRIGGERS_SQL:
+                cursor.execute(sql)
+
+
+def drop_search_triggers(using=connection):
+    '''Снимает триггеры перед массовой загрузкой; индекс потом
+    собирается целиком через install_search_index(rebuild=True).
+    '''
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        for sql in DROP_SQL[:-1]:
+            cursor.execute(sql)
+
+
+def drop_search_index(using=connection):
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+
+
+def match_expression(query):
+    '''Превращает ввод пользователя в запрос FTS5: все слова, каждое
+    как префикс, без операторов синтаксиса FTS5.
+    '''
+    return ' '.join(f'"{word}"*' for word in WORD.findall(query))
+
+
+def search_posts(query):
+    '''Выборка постов, подходящих под запрос, без учёта релевантности.'''
+    expression = match_expression(query)
+    if not expression:
+        return Post.objects.none()
+    if not fts_available():
+        words = WORD.findall(query)
+        queryset = Post.objects.all()
+        for word in words:
+            queryset = queryset.filter(text__icontains=word)
+        return queryset
+    # RawSQL в pk__in Django 2.2 оборачивает в ((...)), и SQLite
+    # сравнивает id только с первой строкой подзапроса.
+    return Post.objects.extra(
+        where=[
+            f'posts_post.id IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[expression],
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    '''Паджинатор результатов поиска по ключу (релевантность, id).
+
+    Релевантность bm25 считает FTS5, посты страницы загружаются одним
+    запросом через Post.objects.for_feed(). Без FTS5 результаты идут от
+    новых к старым, как в ленте.
+    '''
+
+    def __init__(self, query, per_page, **kwargs):
+        self.expression = match_expression(query)
+        self.ranked = bool(self.expression) and fts_available()
+        super().__init__(search_posts(query), per_page, **kwargs)
+
+    def fetch(self, limit, condition='', params=(), descending=False,
+              offset=0):
+        '''Посты страницы в порядке релевантности с рангом в search_rank.'''
+        order = 'DESC' if descending else 'ASC'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, rank FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s {condition} '
+                f'ORDER BY rank {order}, rowid {order} LIMIT %s OFFSET %s',
+                [self.expression, *params, limit, offset],
+            )
+            ranks = dict(cursor.fetchall())
+        posts = Post.objects.for_feed().in_bulk(list(ranks))
+        object_list = []
+        for pk, rank in ranks.items():
+            if pk in posts:
+                posts[pk].search_rank = rank
+                object_list.append(posts[pk])
+        return object_list
+
+    def page(self, number):
+        if not self.ranked:
+            return super().page(number)
+        number = self.validate_number(number)
+        object_list = self.fetch(
+            self.per_page + 1, offset=(number - 1) * self.per_page
+        )
+        if not object_list and number > 1:
+            raise EmptyPage('That page contains no results')
+        return self._get_page(
+            object_list[:self.per_page],
+            number,
+            self,
+            has_previous=number > 1,
+            has_next=len(object_list) > self.per_page,
+        )
+
+    def last_page(self):
+        if not self.ranked:
+            return super().last_page()
+        number, size = self.last_page_size()
+        return self.reversed_last_page(
+            self.fetch(size + 1, descending=True), number, size
+        )
+
+    def get_cursor_page(self, cursor):
+        if not self.ranked:
+            return super().get_cursor_page(cursor)
+        try:
+            direction, skip, number, (rank, pk) = self.decode_cursor(
+                cursor
+            )
+        except InvalidCursor:
+            return self.page(1)
+        offset = skip * self.per_page
+        if direction == self.NEXT:
+            object_list = self.fetch(
+                self.per_page + 1,
+                'AND (rank > %s OR (rank = %s AND rowid > %s))',
+                (rank, rank, pk),
+                offset=offset,
+            )
+            if not object_list:
+                return self.last_page()
+            return self._get_page(
+                object_list[:self.per_page],
+                number,
+                self,
+                has_previous=True,
+                has_next=len(object_list) > self.per_page,
+            )
+        object_list = self.fetch(
+            self.per_page + 1,
+            'AND (rank < %s OR (rank = %s AND rowid < %s))',
+            (rank, rank, pk),
+            descending=True,
+            offset=offset,
+        )
+        if not object_list:
+            return self.page(1)
+        has_previous = len(object_list) > self.per_page
+        return self._get_page(
+            object_list[:self.per_page][::-1],
+            max(number, 2) if has_previous else 1,
+            self,
+            has_previous=has_previous,
+            has_next=True,
+        )
+
+    def cursor_key(self, obj):
+        if not self.ranked:
+            return super().cursor_key(obj)
+        return repr(obj.search_rank), str(obj.pk)
+
+    def parse_cursor_key(self, values):
+        if not self.ranked:
+            return super().parse_cursor_key(values)
+        rank, pk = values
+        rank, pk = float(rank), int(pk)
+        if not math.isfinite(rank):
+            raise ValueError('Cursor rank is not finite')
+        if not 0 < pk <= MAX_INTEGER:
+            raise ValueError('Cursor id is out of range')
+        return rank, pk
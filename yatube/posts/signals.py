@@ -0,0 +1,164 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from .cache import (
+    FEED_EPOCH, bump_feed_versions, forget_author_cards, forget_group_cards,
+    forget_post_card,
+)
+from .group_feeds import forget_group_feeds_on_commit
+from .lookups import author_by_username, group_by_slug
+from .models import AuthorStats, Group, Post, User
+
+# Поля автора и группы, которые выводит карточка поста.
+CARD_AUTHOR_FIELDS = ('username', 'first_name', 'last_name')
+CARD_GROUP_FIELDS = ('slug',)
+
+
+def change_author_count(author_id, delta):
+    '''Сдвигает счётчик постов автора, создавая строку при первом посте.'''
+    updated = AuthorStats.objects.filter(
+        author_id=author_id, posts_count__gte=-delta
+    ).update(posts_count=F('posts_count') + delta)
+    if not updated and delta > 0:
+        AuthorStats.objects.get_or_create(
+            author_id=author_id, defaults={'posts_count': delta}
+        )
+
+
+def change_group_count(group_id, delta):
+    '''Сдвигает счётчик постов группы, не опуская его ниже нуля.'''
+    if group_id is None:
+        return
+    Group.objects.filter(
+        pk=group_id, posts_count__gte=-delta
+    ).update(posts_count=F('posts_count') + delta)
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    # Группа, учтённая в счётчиках: по ней видно перенос поста. Если
+    # group_id отложен (only/defer), её прочитает counted_group_id.
+    if 'group_id' not in instance.get_deferred_fields():
+        instance._counted_group_id = instance.group_id
+
+
+def counted_group_id(instance):
+    '''Группа поста, учтённая в счётчиках, до сохранения или удаления.'''
+    if not hasattr(instance, '_counted_group_id'):
+        instance._counted_group_id = (
+            Post.objects.filter(pk=instance.pk)
+            .order_by()
+            .values_list('group_id', flat=True)
+            .first()
+        )
+    return instance._counted_group_id
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def load_counted_group(sender, instance, raw=False, **kwargs):
+    # Запрос нужен, только если пост загружен без group_id.
+    if not raw and not instance._state.adding:
+        counted_group_id(instance)
+
+
+def bump_post_feeds(post, *group_ids):
+    '''Сбрасывает страницы лент, в которых виден пост.'''
+    usernames = User.objects.filter(pk=post.author_id).values_list(
+        'username', flat=True
+    )
+    slugs = Group.objects.filter(
+        pk__in={pk for pk in group_ids if pk is not None}
+    ).values_list('slug', flat=True)
+    # Кэшированные группа и автор несут счётчики постов.
+    author_by_username.forget(*usernames)
+    group_by_slug.forget(*slugs)
+    bump_feed_versions(
+        'index',
+        f'post:{post.pk}',
+        *(f'profile:{username}' for username in usernames),
+        *(f'group:{slug}' for slug in slugs),
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_group_id = instance._counted_group_id
+    if created:
+        change_author_count(instance.author_id, 1)
+        change_group_count(instance.group_id, 1)
+    elif old_group_id != instance.group_id:
+        change_group_count(old_group_id, -1)
+        change_group_count(instance.group_id, 1)
+    forget_group_feeds_on_commit(old_group_id, instance.group_id)
+    instance._counted_group_id = instance.group_id
+    if not created:
+        forget_post_card(instance)
+    bump_post_feeds(instance, old_group_id, instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance._counted_group_id, -1)
+    forget_group_feeds_on_commit(instance._counted_group_id)
+    forget_post_card(instance)
+    bump_post_feeds(instance, instance._counted_group_id)
+
+
+def card_fields(instance, fields):
+    return tuple(instance.__dict__.get(field) for field in fields)
+
+
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=Group)
+def remember_card_fields(sender, instance, **kwargs):
+    fields = CARD_AUTHOR_FIELDS if sender is User else CARD_GROUP_FIELDS
+    instance._card_fields = card_fields(instance, fields)
+
+
+@receiver(post_save, sender=User)
+def forget_renamed_author_cards(sender, instance, created, **kwargs):
+    fields = card_fields(instance, CARD_AUTHOR_FIELDS)
+    # Имя могло быть запомнено как отсутствующее или смениться.
+    author_by_username.forget(
+        *{instance.username, instance._card_fields[0]} - {None}
+    )
+    if not created and fields != instance._card_fields:
+        forget_author_cards(instance)
+        bump_feed_versions(FEED_EPOCH)
+    instance._card_fields = fields
+
+
+@receiver(post_save, sender=Group)
+def forget_renamed_group_cards(sender, instance, created, **kwargs):
+    fields = card_fields(instance, CARD_GROUP_FIELDS)
+    group_by_slug.forget(*{instance.slug, instance._card_fields[0]} - {None})
+    if created:
+        # У новой группы постов нет, а в кэше мог остаться список
+        # группы с тем же id.
+        forget_group_feeds_on_commit(instance.pk, hits=True)
+    elif fields != instance._card_fields:
+        forget_group_cards(instance)
+    # Заголовок и описание группы выводятся на страницах лент.
+    bump_feed_versions(FEED_EPOCH)
+    instance._card_fields = fields
+
+
+@receiver(pre_delete, sender=Group)
+def forget_deleted_group_cards(sender, instance, **kwargs):
+    # Посты останутся без группы (SET_NULL), ссылка в карточке устареет.
+    forget_group_cards(instance)
+    forget_group_feeds_on_commit(instance.pk, hits=True)
+    group_by_slug.forget(instance.slug)
+    bump_feed_versions(FEED_EPOCH)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_author(sender, instance, **kwargs):
+    author_by_username.forget(instance.username)
@@ -0,0 +1,11 @@
+from django import template
+
+from ..cache import render_post_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(page_obj):
+    '''Карточки постов страницы из кэша фрагментов.'''
+    return render_post_cards(list(page_obj))
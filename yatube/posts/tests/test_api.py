@@ -0,0 +1,128 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostsApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.other_user = User.objects.create_user(username='Другой')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}', group=cls.group)
+            for number in range(12)
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.other_user, text='Пост без группы'
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_json(self, url, **params):
+        response = self.guest_client.get(url, params)
+        return response.status_code, response.json()
+
+    def test_cursor_pages(self):
+        '''Проверка: курсор next ведёт на следующую страницу без
+        повторов, и вместе страницы дают все посты.
+        '''
+        status, first = self.get_json(reverse('posts:api_posts'))
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual(len(first['results']), 10)
+        self.assertIsNone(first['previous'])
+        second = self.guest_client.get(first['next']).json()
+        self.assertIsNone(second['next'])
+        ids = [post['id'] for post in first['results'] + second['results']]
+        self.assertEqual(
+            ids,
+            list(Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )),
+        )
+
+    def test_lists_and_detail(self):
+        '''Проверка: ленты группы и автора, пост по id и выбор полей.'''
+        status, data = self.get_json(
+            reverse('posts:api_group_posts', args=[self.group.slug]),
+            limit=20, fields='id,group',
+        )
+        self.assertEqual(len(data['results']), 12)
+        self.assertEqual(
+            data['results'][0], {'id': data['results'][0]['id'],
+                                 'group': 'test-slug'}
+        )
+        status, data = self.get_json(
+            reverse('posts:api_author_posts', args=[self.other_user.username])
+        )
+        self.assertEqual(data['results'], [{
+            'id': self.other_post.pk,
+            'text': 'Пост без группы',
+            'pub_date': self.other_post.pub_date.isoformat()[:23],
+            'author': 'Другой',
+            'group': None,
+        }])
+        status, data = self.get_json(
+            reverse('posts:api_post_detail', args=[self.other_post.pk]),
+            fields='text',
+        )
+        self.assertEqual(data, {'text': 'Пост без группы'})
+
+    def test_errors(self):
+        '''Проверка: неверные параметры и адреса отдают ошибку в JSON.'''
+        cases = (
+            (reverse('posts:api_posts'), {'fields': 'id,secret'},
+             HTTPStatus.BAD_REQUEST),
+            (reverse('posts:api_posts'), {'limit': '1000'},
+             HTTPStatus.BAD_REQUEST),
+            (reverse('posts:api_posts'), {'limit': 'ten'},
+             HTTPStatus.BAD_REQUEST),
+            (reverse('posts:api_group_posts', args=['missing']), {},
+             HTTPStatus.NOT_FOUND),
+            (reverse('posts:api_post_detail', args=[0]), {},
+             HTTPStatus.NOT_FOUND),
+        )
+        for url, params, status in cases:
+            with self.subTest(url=url, params=params):
+                response_status, data = self.get_json(url, **params)
+                self.assertEqual(response_status, status)
+                self.assertIn('error', data)
+
+    @override_settings(API_STREAM_CHUNK_SIZE=5)
+    def test_ndjson_export(self):
+        '''Проверка: выгрузка ndjson отдаёт все посты потоком, по посту
+        в строке.
+        '''
+        response = self.guest_client.get(
+            reverse('posts:api_posts'), {'format': 'ndjson', 'fields': 'id'}
+        )
+        self.assertTrue(response.streaming)
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3)
+        rows = [
+            json.loads(line)
+            for line in b''.join(chunks).decode().splitlines()
+        ]
+        self.assertEqual(
+            [row['id'] for row in rows],
+            list(Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )),
+        )
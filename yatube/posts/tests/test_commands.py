@@ -0,0 +1,203 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from ..models import AuthorStats, Group, ImportProgress, Post
+from ..search import FTS_TABLE
+
+User = get_user_model()
+
+
+class ImportExportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=cls.user, text='Первый пост')
+        Post.objects.create(
+            author=cls.user, text='Второй, "с кавычками"', group=cls.group
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def call(self, *args, **options):
+        call_command(*args, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def snapshot(self):
+        return list(
+            Post.objects.order_by('pk').values_list(
+                'text', 'pub_date', 'author__username', 'group__slug'
+            )
+        )
+
+    def test_export_import_round_trip(self):
+        '''Проверка: выгруженные посты загружаются обратно без потерь.'''
+        expected = self.snapshot()
+        for file_format in ('ndjson', 'csv'):
+            with self.subTest(file_format=file_format):
+                path = os.path.join(self.directory, f'posts.{file_format}')
+                self.call('export_posts', path)
+                Post.objects.all().delete()
+                self.call('import_posts', path, batch_size=1, chunk_size=1)
+                self.assertEqual(self.snapshot(), expected)
+                self.assertEqual(
+                    AuthorStats.objects.get(author=self.user).posts_count,
+                    len(expected),
+                )
+
+    def test_import_resumes_after_failure(self):
+        '''Проверка: после ошибки загрузка продолжается с последней
+        сохранённой транзакции.
+        '''
+        Post.objects.all().delete()
+        path = os.path.join(self.directory, 'posts.ndjson')
+        records = [
+            {'text': f'Пост {number}', 'author': self.user.username}
+            for number in range(4)
+        ]
+        with open(path, 'w') as source:
+            for record in records[:3]:
+                source.write(json.dumps(record) + '\n')
+            source.write('{broken\n')
+        with self.assertRaises(CommandError):
+            self.call('import_posts', path, chunk_size=2)
+        self.assertEqual(Post.objects.count(), 2)
+        with open(path, 'w') as source:
+            for record in records:
+                source.write(json.dumps(record) + '\n')
+        self.call('import_posts', path, chunk_size=2, resume=True)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            [record['text'] for record in records],
+        )
+        self.assertFalse(ImportProgress.objects.exists())
+
+    def test_import_progress_commits_with_posts(self):
+        '''Проверка: сбой до записи прогресса откатывает и посты пачки,
+        поэтому продолжение не создаёт дублей.
+        '''
+        Post.objects.all().delete()
+        path = os.path.join(self.directory, 'posts.ndjson')
+        texts = [f'Пост {number}' for number in range(4)]
+        with open(path, 'w') as source:
+            for text in texts:
+                source.write(json.dumps(
+                    {'text': text, 'author': self.user.username}
+                ) + '\n')
+        save = ImportProgress.save
+        calls = []
+
+        def failing_save(progress, *args, **kwargs):
+            calls.append(progress.records)
+            if len(calls) == 2:
+                raise RuntimeError('Сбой после вставки пачки')
+            return save(progress, *args, **kwargs)
+
+        with mock.patch.object(ImportProgress, 'save', failing_save):
+            with self.assertRaises(RuntimeError):
+                self.call('import_posts', path, chunk_size=2)
+        self.assertEqual(Post.objects.count(), 2)
+        self.call('import_posts', path, chunk_size=2, resume=True)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)), texts
+        )
+
+    def test_import_default_batch_fits_sqlite(self):
+        '''Проверка: пачка по умолчанию не упирается в лимиты SQLite.'''
+        path = os.path.join(self.directory, 'posts.ndjson')
+        with open(path, 'w') as source:
+            for number in range(600):
+                source.write(json.dumps(
+                    {'text': f'Пост {number}', 'author': self.user.username}
+                ) + '\n')
+        self.call('import_posts', path)
+        self.assertEqual(Post.objects.count(), 602)
+
+
+class BenchCommandsTest(TestCase):
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def call(self, *args, **options):
+        call_command(*args, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_seed_bench_skews_authors(self):
+        '''Проверка: seed_bench создаёт данные и пересчитывает счётчики,
+        а первый автор пишет больше последнего.
+        '''
+        self.call('seed_bench', users=20, groups=5, posts=500, batch_size=64)
+        self.assertEqual(Post.objects.count(), 500)
+        self.assertEqual(Group.objects.count(), 5)
+        stats = list(
+            AuthorStats.objects.order_by('author_id')
+            .values_list('posts_count', flat=True)
+        )
+        self.assertEqual(sum(stats), 500)
+        self.assertGreater(stats[0], stats[-1])
+
+    def test_seed_bench_restores_search_triggers(self):
+        '''Проверка: прерванная загрузка возвращает триггеры поиска.'''
+        with mock.patch(
+            'posts.management.commands.seed_bench.insert_posts',
+            side_effect=KeyboardInterrupt,
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                self.call('seed_bench', users=2, groups=1, posts=10)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' "
+                'AND name LIKE %s',
+                [f'{FTS_TABLE}_%'],
+            )
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+    def test_bench_views_reports_regressions(self):
+        '''Проверка: bench_views пишет JSON и падает при регрессии
+        относительно baseline.
+        '''
+        self.call('seed_bench', users=5, groups=2, posts=50)
+        output = os.path.join(self.directory, 'bench.json')
+        self.call('bench_views', repeat=2, depth=3, output=output)
+        with open(output) as source:
+            results = json.load(source)
+        self.assertEqual(
+            set(results),
+            {'index', 'index_deep', 'group_posts', 'profile', 'post_detail'},
+        )
+        for result in results.values():
+            self.assertEqual(result['cache'], 'cold')
+            result['queries'] = 0
+        baseline = os.path.join(self.directory, 'baseline.json')
+        with open(baseline, 'w') as target:
+            json.dump(results, target)
+        with self.assertRaisesMessage(CommandError, 'queries'):
+            self.call('bench_views', repeat=2, depth=3, baseline=baseline)
+        with self.assertRaisesMessage(CommandError, 'warm'):
+            self.call(
+                'bench_views', repeat=2, depth=3, baseline=baseline,
+                cold=False,
+            )
@@ -0,0 +1,66 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+
+from ..counts import ApproximateCount, exact_count, sqlite_stat_count
+from ..models import Post
+from ..paginators import Estimate
+
+User = get_user_model()
+
+
+class CountProvidersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text='Пост') for _ in range(5)
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+
+    def test_small_feed_is_counted_exactly(self):
+        '''Проверка: лента до порога считается точно и без кэша.'''
+        count = ApproximateCount('test', threshold=10)
+        self.assertEqual(count(Post.objects.all()), 5)
+        self.assertNotIsInstance(count(Post.objects.all()), Estimate)
+        Post.objects.create(author=self.user, text='Пост')
+        self.assertEqual(count(Post.objects.all()), 6)
+
+    def test_large_feed_count_is_cached(self):
+        '''Проверка: число большой ленты берётся из кэша до истечения
+        таймаута.
+        '''
+        count = ApproximateCount('test', estimates=(exact_count,),
+                                 threshold=3)
+        self.assertEqual(count(Post.objects.all()), 5)
+        Post.objects.create(author=self.user, text='Пост')
+        with self.assertNumQueries(0):
+            self.assertEqual(count(Post.objects.all()), 5)
+        self.assertIsInstance(count(Post.objects.all()), Estimate)
+        cache.clear()
+        self.assertEqual(count(Post.objects.all()), 6)
+
+    def test_unknown_estimate(self):
+        '''Проверка: без оценки число большой ленты неизвестно.'''
+        count = ApproximateCount('test', estimates=(), threshold=3)
+        self.assertIsNone(count(Post.objects.all()))
+
+    @skipUnless(connection.vendor == 'sqlite', 'sqlite_stat1 есть в SQLite')
+    def test_sqlite_stat_count(self):
+        '''Проверка: оценка по sqlite_stat1 доступна после ANALYZE
+        и только для ленты без условий.
+        '''
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(sqlite_stat_count(Post.objects.all()), 5)
+        self.assertIsNone(
+            sqlite_stat_count(Post.objects.filter(author=self.user))
+        )
@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+
+from core.lookups import clear_lookup_caches
+
+from ..group_feeds import (
+    GROUP_FEED_HITS_KEY, GROUP_FEED_KEY, GroupFeedPaginator,
+    count_group_feed_hit, get_group_feed, load_group_feed,
+)
+from ..models import Group, Post
+from ..paginators import CursorPaginator
+
+User = get_user_model()
+
+
+class GroupFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.another_group = Group.objects.create(
+            title='Другая группа',
+            slug='another-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        clear_lookup_caches()
+
+    def cached_ids(self, group):
+        return list(get_group_feed(group.pk).ids)
+
+    def test_feed_follows_post_changes(self):
+        '''Проверка: ленты групп следуют за созданием, правкой, переносом
+        и удалением постов.
+        '''
+        old = Post.objects.create(
+            author=self.user, text='Старый пост', group=self.group
+        )
+        get_group_feed(self.group.pk)
+        get_group_feed(self.another_group.pk)
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        self.assertEqual(self.cached_ids(self.group), [old.pk, post.pk])
+        old.pub_date = post.pub_date + timedelta(seconds=1)
+        old.save()
+        self.assertEqual(self.cached_ids(self.group), [post.pk, old.pk])
+        post.group = self.another_group
+        post.save()
+        self.assertEqual(self.cached_ids(self.group), [old.pk])
+        self.assertEqual(self.cached_ids(self.another_group), [post.pk])
+        post.delete()
+        self.assertEqual(self.cached_ids(self.another_group), [])
+
+    def test_stale_feed_is_reloaded(self):
+        '''Проверка: список, загруженный до изменения ленты, но
+        записанный в кэш после него, не принимается.
+        '''
+        feed = get_group_feed(self.group.pk)
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        # Параллельный запрос прочитал базу до сохранения поста.
+        cache.set(GROUP_FEED_KEY.format(self.group.pk), feed)
+        self.assertEqual(self.cached_ids(self.group), [post.pk])
+
+    def test_group_delete_forgets_feed(self):
+        '''Проверка: удаление группы сбрасывает её ленту и счётчик.'''
+        group = Group.objects.create(
+            title='Удаляемая группа', slug='deleted', description='-'
+        )
+        Post.objects.create(author=self.user, text='Пост', group=group)
+        get_group_feed(group.pk)
+        group_id = group.pk
+        group.delete()
+        self.assertIsNone(cache.get(GROUP_FEED_KEY.format(group_id)))
+        self.assertIsNone(cache.get(GROUP_FEED_HITS_KEY.format(group_id)))
+
+    @override_settings(GROUP_FEED_LENGTH=15)
+    def test_pages_match_database(self):
+        '''Проверка: страницы из списка и глубже него совпадают со
+        страницами, прочитанными из базы.
+        '''
+        started = datetime(2022, 1, 1)
+        Post.objects.bulk_create(
+            Post(author=self.user, text='Пост', group=self.group)
+            for _ in range(25)
+        )
+        # Одинаковые даты у части постов проверяют порядок по id.
+        for number, post in enumerate(Post.objects.order_by('id')):
+            post.pub_date = started + timedelta(minutes=number // 2)
+            post.save()
+        cache.clear()
+        posts = Post.objects.for_feed().filter(group=self.group)
+        database = CursorPaginator(posts, 10)
+        feed = GroupFeedPaginator(posts, 10, get_group_feed(self.group.pk))
+        self.assertFalse(feed.feed.complete)
+        for number in (1, 2, 3):
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(feed.page(number)), list(database.page(number))
+                )
+        pages = [feed.page(1)]
+        while pages[-1].has_next():
+            pages.append(feed.get_cursor_page(pages[-1].next_cursor))
+        self.assertEqual(
+            [post for page in pages for post in page],
+            list(posts.order_by('-pub_date', '-id')),
+        )
+        previous_page = feed.get_cursor_page(pages[-1].previous_cursor)
+        self.assertEqual(list(previous_page), list(pages[-2]))
+
+    def test_cached_feed_reads_posts_by_key(self):
+        '''Проверка: при загруженной ленте страница группы читает только
+        группу и посты.
+        '''
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        get_group_feed(self.group.pk)
+        with self.assertNumQueries(2):
+            Client().get(
+                reverse('posts:group_list', kwargs={'slug': self.group.slug})
+            )
+
+    def test_warm_group_feeds(self):
+        '''Проверка: команда загружает ленты самых посещаемых групп
+        и уменьшает их счётчики.
+        '''
+        for _ in range(4):
+            count_group_feed_hit(self.group.pk)
+        count_group_feed_hit(self.another_group.pk)
+        call_command('warm_group_feeds', top=1, stdout=StringIO())
+        self.assertIsNotNone(cache.get(GROUP_FEED_KEY.format(self.group.pk)))
+        self.assertIsNone(
+            cache.get(GROUP_FEED_KEY.format(self.another_group.pk))
+        )
+        self.assertEqual(
+            cache.get(GROUP_FEED_HITS_KEY.format(self.group.pk)), 2
+        )
+
+
+class GroupFeedCommitTest(TransactionTestCase):
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        clear_lookup_caches()
+        self.user = User.objects.create_user(username='Mokrushin')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def test_feed_loaded_before_commit_is_dropped(self):
+        '''Проверка: список, загруженный до фиксации транзакции с новым
+        постом, устаревает после неё.
+        '''
+        with transaction.atomic():
+            Post.objects.create(
+                author=self.user, text='Тестовый пост', group=self.group
+            )
+            loaded = load_group_feed(self.group.pk)
+        self.assertNotEqual(
+            get_group_feed(self.group.pk).version, loaded.version
+        )
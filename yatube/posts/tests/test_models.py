@@ -1,7 +1,10 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import AuthorStats, Group, Post
 
 User = get_user_model()
 
@@ -64,3 +67,86 @@ class PostModelTest(TestCase):
                     PostModelTest.post._meta.get_field(value).help_text,
                     expected,
                 )
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.another_group = Group.objects.create(
+            title='Другая группа',
+            slug='another-slug',
+            description='Тестовое описание',
+        )
+
+    def assert_counters(self, author_count, group_count, another_count):
+        counters = (
+            (AuthorStats.objects.get(author=self.user).posts_count,
+             author_count),
+            (Group.objects.get(pk=self.group.pk).posts_count, group_count),
+            (Group.objects.get(pk=self.another_group.pk).posts_count,
+             another_count),
+        )
+        for value, expected in counters:
+            with self.subTest(expected=expected):
+                self.assertEqual(value, expected)
+
+    def test_counters_follow_post_changes(self):
+        '''Счётчики меняются при создании, переносе и удалении поста.'''
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        Post.objects.create(author=self.user, text='Пост без группы')
+        self.assert_counters(2, 1, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.another_group
+        post.save()
+        self.assert_counters(2, 0, 1)
+        post.delete()
+        self.assert_counters(1, 0, 0)
+
+    def test_group_delete_keeps_author_counter(self):
+        '''Удаление группы обнуляет группу у постов, не трогая автора.'''
+        group = Group.objects.create(
+            title='Удаляемая группа', slug='deleted', description='-'
+        )
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=group
+        )
+        group.delete()
+        post = Post.objects.get(pk=post.pk)
+        self.assertIsNone(post.group)
+        post.group = self.group
+        post.save()
+        self.assert_counters(1, 1, 0)
+
+    def test_counters_follow_deferred_group(self):
+        '''Перенос и удаление поста, загруженного без group_id, тоже
+        учитываются в счётчиках.
+        '''
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        post = Post.objects.only('text').get(pk=post.pk)
+        post.group = self.another_group
+        post.save()
+        self.assert_counters(1, 0, 1)
+        Post.objects.defer('group').get(pk=post.pk).delete()
+        self.assert_counters(0, 0, 0)
+
+    def test_rebuild_post_counters(self):
+        '''Команда пересчитывает счётчики постов, созданных в обход
+        сигналов.
+        '''
+        Post.objects.bulk_create(
+            Post(author=self.user, text='Пост', group=self.group)
+            for _ in range(3)
+        )
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assert_counters(3, 3, 0)
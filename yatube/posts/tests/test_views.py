@@ -1,9 +1,28 @@
+import base64
+import re
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+from unittest import skipUnless
+
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core.lookups import clear_lookup_caches
 from ..models import Group, Post
+from ..cache import FEED_MODIFIED_KEY, FEED_VERSION_KEY
+from ..counts import COUNT_KEY
 from ..forms import PostForm
+from ..group_feeds import GroupFeedPaginator, load_group_feed
+from ..lookups import author_by_username
+from ..paginators import CursorPaginator
+from ..search import SearchPaginator
 
 from django.conf import settings
 
@@ -147,9 +166,13 @@ class Paginator(TestCase):
                 for post in range(cls.TOTAL_POSTS_COUNT)
             ]
         )
+        # bulk_create обходит сигналы, счётчики пересчитываем сами.
+        call_command('rebuild_post_counters', stdout=StringIO())
 
     def setUp(self):
         '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        clear_lookup_caches()
         self.guest_client = Client()
 
     def test_first_page_contains_ten_records(self):
@@ -180,3 +203,792 @@ class Paginator(TestCase):
                 response = self.client.get(address)
                 count_post = len(response.context.get('page_obj'))
                 self.assertEqual(count_post, self.POSTS_ON_LAST_PAGE)
+
+    def test_page_out_of_range_returns_last_page(self):
+        '''Проверка: номер страницы за концом ленты открывает последнюю
+        страницу, а не ошибку.
+        '''
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:search') + '?q=пайджинга',
+        )
+        for address in addresses:
+            for page in ('999', '0'):
+                with self.subTest(address=address, page=page):
+                    separator = '&' if '?' in address else '?'
+                    response = self.guest_client.get(
+                        f'{address}{separator}page={page}'
+                    )
+                    self.assertEqual(response.status_code, HTTPStatus.OK)
+                    page_obj = response.context['page_obj']
+                    self.assertEqual(page_obj.number, self.NUMBER_LAST_PAGE)
+                    self.assertEqual(len(page_obj), self.POSTS_ON_LAST_PAGE)
+                    self.assertFalse(page_obj.has_next())
+
+    def test_cursor_pages_follow_each_other(self):
+        '''Проверка: курсоры ведут на следующую и обратно на первую
+        страницу без пропусков и повторов.
+        '''
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', args=[self.user.username]),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                first_page = self.guest_client.get(address).context[
+                    'page_obj'
+                ]
+                second_page = self.guest_client.get(
+                    address + f'?cursor={first_page.next_cursor}'
+                ).context['page_obj']
+                self.assertEqual(len(second_page), self.POSTS_ON_LAST_PAGE)
+                self.assertFalse(second_page.has_next())
+                self.assertEqual(
+                    set(first_page) & set(second_page), set()
+                )
+                previous_page = self.guest_client.get(
+                    address + f'?cursor={second_page.previous_cursor}'
+                ).context['page_obj']
+                self.assertEqual(list(previous_page), list(first_page))
+                self.assertFalse(previous_page.has_previous())
+
+    def test_cursor_to_deleted_posts_opens_existing_page(self):
+        '''Проверка: курсор к удалённым постам открывает последнюю или
+        первую страницу, а не ошибку.
+        '''
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', args=[self.user.username]),
+        )
+        first_page = self.guest_client.get(addresses[0]).context['page_obj']
+        second_page = self.guest_client.get(
+            addresses[0] + f'?cursor={first_page.next_cursor}'
+        ).context['page_obj']
+        Post.objects.filter(pk__in=[post.pk for post in second_page]).delete()
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(
+                    address + f'?cursor={first_page.next_cursor}'
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                page_obj = response.context['page_obj']
+                self.assertEqual(list(page_obj), list(first_page))
+                self.assertFalse(page_obj.has_next())
+        Post.objects.filter(pk__in=[post.pk for post in first_page]).delete()
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(
+                    address + f'?cursor={second_page.previous_cursor}'
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_invalid_cursor_returns_first_page(self):
+        '''Проверка: неверный курсор открывает первую страницу.'''
+        response = self.guest_client.get(
+            reverse('posts:index') + '?cursor=broken'
+        )
+        self.assertEqual(response.context['page_obj'].number, 1)
+        self.assertEqual(len(response.context['page_obj']), settings.NUM_POSTS)
+
+    def test_crafted_cursor_and_page_number(self):
+        '''Проверка: курсор с ключом вне диапазона полей открывает
+        первую страницу, огромный номер страницы — последнюю.
+        '''
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:search') + '?q=пайджинга',
+        )
+        keys = (
+            '2020-01-01T00:00:00+00:00|1',
+            f'2020-01-01T00:00:00|{2 ** 64}',
+            f'-1.0|{2 ** 64}',
+            'nan|1',
+        )
+        cursors = [
+            base64.urlsafe_b64encode(f'n|2|{key}'.encode()).decode()
+            for key in keys
+        ]
+        for address in addresses:
+            separator = '&' if '?' in address else '?'
+            for cursor in cursors:
+                with self.subTest(address=address, cursor=cursor):
+                    response = self.guest_client.get(
+                        f'{address}{separator}cursor={cursor}'
+                    )
+                    self.assertEqual(response.status_code, HTTPStatus.OK)
+                    self.assertEqual(response.context['page_obj'].number, 1)
+            with self.subTest(address=address, page='9' * 30):
+                response = self.guest_client.get(
+                    f'{address}{separator}page={"9" * 30}'
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                page_obj = response.context['page_obj']
+                self.assertEqual(page_obj.number, self.NUMBER_LAST_PAGE)
+
+    def test_page_window(self):
+        '''Проверка: навигация показывает окно страниц вокруг текущей,
+        первую и последнюю страницы и пропуски между ними.
+        '''
+        paginator = CursorPaginator(Post.objects.all(), 10, count=1000)
+        cases = (
+            (1, [1, 2, 3, None, 100]),
+            (4, [1, 2, 3, 4, 5, 6, None, 100]),
+            (50, [1, None, 48, 49, 50, 51, 52, None, 100]),
+            (100, [1, None, 98, 99, 100]),
+        )
+        for number, window in cases:
+            with self.subTest(number=number):
+                page = paginator._get_page(
+                    [], number, paginator,
+                    has_previous=number > 1, has_next=number < 100,
+                )
+                self.assertEqual(page.page_window, window)
+
+    def test_page_window_without_count(self):
+        '''Проверка: у ленты длиннее count_limit нет последней страницы,
+        а COUNT(*) не выходит за предел.
+        '''
+        paginator = CursorPaginator(Post.objects.all(), 10, count_limit=5)
+        page = paginator.get_page(1)
+        self.assertIsNone(paginator.known_count)
+        self.assertEqual(page.page_window, [1, 2, None])
+        paginator = CursorPaginator(Post.objects.all(), 10, count_limit=20)
+        self.assertEqual(paginator.get_page(1).page_window, [1, 2])
+
+    def test_navigation_links(self):
+        '''Проверка: ссылки навигации на страницы окна — курсоры.'''
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertNotContains(response, '?page=2')
+        self.assertContains(response, '?cursor=', count=2)
+
+    def test_page_links_open_window_pages(self):
+        '''Проверка: каждая ссылка окна, в том числе курсор с пропуском
+        страниц и ?page=last, открывает ту же страницу, что и номер.
+        '''
+        paginators = (
+            CursorPaginator(Post.objects.all(), 2),
+            GroupFeedPaginator(
+                Post.objects.filter(group=self.group), 2,
+                feed=load_group_feed(self.group.pk),
+            ),
+            SearchPaginator('пайджинга', 2),
+        )
+        for paginator in paginators:
+            for current in (1, 4, 7):
+                page = paginator.page(current)
+                for number, link, _ in page.page_links:
+                    if link is None:
+                        continue
+                    with self.subTest(
+                        paginator=type(paginator).__name__,
+                        current=current,
+                        link=link,
+                    ):
+                        name, value = link.split('=', 1)
+                        if name == 'cursor':
+                            target = paginator.get_cursor_page(value)
+                        else:
+                            target = paginator.get_page(value)
+                        self.assertEqual(target.number, number)
+                        self.assertEqual(
+                            list(target), list(paginator.page(number))
+                        )
+
+    def test_estimated_last_page(self):
+        '''Проверка: номер последней страницы по завышенной оценке
+        помечен как приблизительный, а ссылка на неё открывает
+        настоящую последнюю страницу.
+        '''
+        cache.set(COUNT_KEY.format('index'), 1000)
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, '&asymp;100')
+        self.assertContains(response, '?page=last')
+        response = self.guest_client.get(
+            reverse('posts:index') + '?page=last'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        page_obj = response.context['page_obj']
+        self.assertFalse(page_obj.has_next())
+        self.assertEqual(
+            page_obj[-1], Post.objects.order_by('pub_date', 'id').first()
+        )
+
+    def test_skip_cursor_past_the_end(self):
+        '''Проверка: курсор с пропуском за конец ленты открывает
+        последнюю страницу, а пропуск шире окна не принимается.
+        '''
+        paginator = CursorPaginator(Post.objects.all(), 2)
+        page = paginator.page(6)
+        cursor = paginator.encode_cursor(
+            page[-1], 8, CursorPaginator.NEXT, skip=1
+        )
+        target = paginator.get_cursor_page(cursor)
+        self.assertEqual(target.number, 7)
+        self.assertFalse(target.has_next())
+        cursor = paginator.encode_cursor(
+            page[-1], 9, CursorPaginator.NEXT, skip=2
+        )
+        self.assertEqual(paginator.get_cursor_page(cursor).number, 1)
+
+
+class FeedQueriesTest(TestCase):
+    '''Число запросов ленты не зависит от числа постов на странице.'''
+
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='Mokrushin',
+            first_name='Евгений',
+            last_name='Мокрушин',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        clear_lookup_caches()
+        self.guest_client = Client()
+
+    def assert_feed_queries(self, index_queries=1):
+        # Лента группы при пустом кэше загружает список ключей постов.
+        addresses = (
+            (reverse('posts:index'), index_queries),
+            (reverse('posts:group_list', kwargs={'slug': self.group.slug}), 3),
+            (reverse('posts:profile', args=[self.user.username]), 2),
+        )
+        for address, queries in addresses:
+            with self.subTest(address=address):
+                with self.assertNumQueries(queries):
+                    self.guest_client.get(address)
+
+    def test_feed_queries_with_single_post(self):
+        '''Проверка: лента с одним постом укладывается в свои запросы.'''
+        self.assert_feed_queries()
+
+    def test_feed_queries_with_full_page(self):
+        '''Проверка: полная страница постов разных авторов и групп
+        не добавляет запросов на автора и группу каждого поста.
+        '''
+        for number in range(settings.NUM_POSTS):
+            author = User.objects.create_user(
+                username=f'author_{number}', first_name=f'Имя {number}'
+            )
+            group = Group.objects.create(
+                title=f'Группа {number}',
+                slug=f'group-{number}',
+                description='Тестовое описание',
+            )
+            Post.objects.create(author=author, text='Пост', group=group)
+            Post.objects.create(
+                author=self.user, text='Пост', group=self.group
+            )
+        # У общей ленты нет счётчика: окну навигации нужен COUNT
+        # с ограничением PAGINATOR_APPROXIMATE_THRESHOLD.
+        self.assert_feed_queries(index_queries=2)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть в SQLite')
+class FeedQueryPlanTest(TestCase):
+    '''Запросы лент читают посты по индексу, без полной сортировки.'''
+    FULL_SCAN = re.compile(r'SCAN (TABLE )?posts_post(?! USING)')
+
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text='Пост', group=cls.group)
+            for _ in range(settings.NUM_POSTS + 1)
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+
+    def get_feed_queries(self, address):
+        client = Client()
+        with CaptureQueriesContext(connection) as first:
+            page_obj = client.get(address).context['page_obj']
+        with CaptureQueriesContext(connection) as second:
+            client.get(address + f'?cursor={page_obj.next_cursor}')
+        # Ограниченный COUNT(*) для навигации читает не больше
+        # PAGINATOR_APPROXIMATE_THRESHOLD строк, его план не проверяем.
+        return [
+            query['sql']
+            for query in first.captured_queries + second.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+            and not query['sql'].startswith('SELECT COUNT(*) FROM (')
+        ]
+
+    def test_feed_queries_use_indexes(self):
+        '''Проверка: в плане лент нет полного скана и временного B-дерева
+        для ORDER BY.
+        '''
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', args=[self.user.username]),
+        )
+        for address in addresses:
+            for sql in self.get_feed_queries(address):
+                with self.subTest(address=address, sql=sql):
+                    with connection.cursor() as cursor:
+                        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                        plan = [row[-1] for row in cursor.fetchall()]
+                    for step in plan:
+                        self.assertNotIn('TEMP B-TREE', step)
+                        self.assertIsNone(self.FULL_SCAN.search(step))
+
+
+class PostCardCacheTest(TestCase):
+    '''Карточки постов берутся из кэша и сбрасываются при изменениях.'''
+
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.user = User.objects.create_user(
+            username='Mokrushin', first_name='Евгений'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.cache_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_index(self):
+        return self.guest_client.get(reverse('posts:index')).content.decode()
+
+    def check_invalidation(self):
+        user = User.objects.get(pk=self.user.pk)
+        group = Group.objects.get(pk=self.group.pk)
+        self.assertIn('Тестовый пост', self.get_index())
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            data={'text': 'Новый текст', 'group': group.pk},
+        )
+        self.assertIn('Новый текст', self.get_index())
+        user.first_name = 'Иван'
+        user.save()
+        self.assertIn('Иван', self.get_index())
+        group.slug = 'new-slug'
+        group.save()
+        self.assertIn('/group/new-slug/', self.get_index())
+        group.delete()
+        self.assertNotIn('/group/', self.get_index())
+
+    def test_cards_are_served_from_cache(self):
+        '''Проверка: повторная страница не отрисовывает карточку заново.'''
+        self.get_index()
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertTemplateNotUsed(response, 'includes/post.html')
+        self.assertContains(response, 'Тестовый пост')
+
+    def test_cards_invalidation_locmem(self):
+        '''Проверка: карточки сбрасываются при правке поста, автора
+        и группы в локальном кэше.
+        '''
+        self.check_invalidation()
+
+    def test_cards_invalidation_file_based(self):
+        '''Проверка: то же самое в файловом кэше.'''
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self.cache_dir,
+        }}):
+            self.check_invalidation()
+
+
+class AnonymousPageCacheTest(TestCase):
+    '''Страницы лент для гостей берутся из кэша до изменения ленты.'''
+
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='admin'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+        cls.addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', args=[cls.user.username]),
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_repeated_page_is_cached(self):
+        '''Проверка: повторный запрос гостя не обращается к базе и не
+        отрисовывает шаблон.
+        '''
+        for address in self.addresses:
+            with self.subTest(address=address):
+                first = self.guest_client.get(address)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(address)
+                self.assertEqual(second.templates, [])
+                self.assertEqual(second.content, first.content)
+
+    def test_new_post_resets_cached_pages(self):
+        '''Проверка: новый пост сбрасывает страницы своих лент.'''
+        for address in self.addresses:
+            self.guest_client.get(address)
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        for address in self.addresses:
+            with self.subTest(address=address):
+                self.assertContains(
+                    self.guest_client.get(address), 'Свежий пост'
+                )
+
+    def test_authorized_pages_are_not_cached(self):
+        '''Проверка: страницы пользователя отрисовываются каждый раз.'''
+        self.authorized_client.get(reverse('posts:index'))
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertTemplateUsed(response, 'posts/index.html')
+
+    def test_admin_shows_page_cache_stats(self):
+        '''Проверка: в админке видна статистика кэша страниц.'''
+        self.guest_client.get(reverse('posts:index'))
+        self.guest_client.get(reverse('posts:index'))
+        admin_client = Client()
+        admin_client.force_login(self.admin)
+        response = admin_client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(
+            response.context['page_cache_stats'],
+            {'hits': 1, 'misses': 1, 'hit_ratio': 0.5},
+        )
+
+
+class LookupCacheTest(TestCase):
+    '''Группы и авторы лент берутся из кэша поиска по адресу.'''
+
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        clear_lookup_caches()
+        self.guest_client = Client()
+
+    def get_status(self, name, key):
+        return self.guest_client.get(reverse(name, args=[key])).status_code
+
+    def test_renamed_group_and_author(self):
+        '''Проверка: после смены slug и имени старые адреса отдают 404,
+        новые открываются.
+        '''
+        self.assertEqual(
+            self.get_status('posts:group_list', 'test-slug'), HTTPStatus.OK
+        )
+        self.assertEqual(
+            self.get_status('posts:profile', 'Mokrushin'), HTTPStatus.OK
+        )
+        self.assertEqual(
+            self.get_status('posts:group_list', 'new-slug'),
+            HTTPStatus.NOT_FOUND,
+        )
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'new-slug'
+        group.save()
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'Renamed'
+        user.save()
+        cases = (
+            ('posts:group_list', 'test-slug', HTTPStatus.NOT_FOUND),
+            ('posts:group_list', 'new-slug', HTTPStatus.OK),
+            ('posts:profile', 'Mokrushin', HTTPStatus.NOT_FOUND),
+            ('posts:profile', 'Renamed', HTTPStatus.OK),
+        )
+        for name, key, status in cases:
+            with self.subTest(name=name, key=key):
+                self.assertEqual(self.get_status(name, key), status)
+
+    def test_cached_author_has_no_credentials(self):
+        '''Проверка: в общий кэш попадают только поля автора для
+        профиля, без хэша пароля, почты и прав.
+        '''
+        self.get_status('posts:profile', 'Mokrushin')
+        author = cache.get(author_by_username.key('Mokrushin'))
+        self.assertEqual(author.pk, self.user.pk)
+        for field in ('password', 'email', 'is_staff', 'is_superuser'):
+            with self.subTest(field=field):
+                self.assertNotIn(field, author.__dict__)
+
+    def test_missing_slug_does_not_query(self):
+        '''Проверка: повторный запрос несуществующей группы не идёт в
+        базу.
+        '''
+        self.get_status('posts:group_list', 'missing')
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.get_status('posts:group_list', 'missing'),
+                HTTPStatus.NOT_FOUND,
+            )
+
+
+class ConditionalGetTest(TestCase):
+    '''Ленты и страница поста отвечают 304 по ETag и Last-Modified.'''
+
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Mokrushin')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        cache.clear()
+        self.guest_client = Client()
+        self.addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        )
+
+    def test_not_modified_page_is_not_rendered(self):
+        '''Проверка: ответ 304 не отрисовывает шаблоны и не читает
+        списки постов.
+        '''
+        for address in self.addresses:
+            with self.subTest(address=address):
+                etag = self.guest_client.get(address)['ETag']
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.guest_client.get(
+                        address, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertEqual(response.templates, [])
+                # Странице поста нужно лишь имя автора по ключу поста.
+                self.assertLessEqual(len(queries), 1)
+                for query in queries.captured_queries:
+                    self.assertNotIn('ORDER BY', query['sql'])
+
+    def test_missing_pages_leave_no_feed_versions(self):
+        '''Проверка: адреса 404 не заводят в кэше версий лент.'''
+        feeds = {
+            'group:missing': reverse(
+                'posts:group_list', kwargs={'slug': 'missing'}
+            ),
+            'profile:missing': reverse('posts:profile', args=['missing']),
+            f'post:{self.post.pk + 1}': reverse(
+                'posts:post_detail', args=[self.post.pk + 1]
+            ),
+        }
+        for feed, address in feeds.items():
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+                self.assertIsNone(cache.get(FEED_VERSION_KEY.format(feed)))
+                self.assertIsNone(cache.get(FEED_MODIFIED_KEY.format(feed)))
+
+    def test_if_modified_since(self):
+        '''Проверка: гость получает 304 по Last-Modified.'''
+        for address in self.addresses:
+            with self.subTest(address=address):
+                last_modified = self.guest_client.get(address)[
+                    'Last-Modified'
+                ]
+                response = self.guest_client.get(
+                    address, HTTP_IF_MODIFIED_SINCE=last_modified
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+
+    def test_changes_reset_validators(self):
+        '''Проверка: новый пост и правка поста меняют ETag.'''
+        etags = {
+            address: self.guest_client.get(address)['ETag']
+            for address in self.addresses
+        }
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group
+        )
+        for address, etag in etags.items():
+            with self.subTest(address=address):
+                response = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_authorized_validators(self):
+        '''Проверка: у вошедшего пользователя свой ETag и нет
+        Last-Modified.
+        '''
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        for address in self.addresses:
+            with self.subTest(address=address):
+                guest = self.guest_client.get(address)
+                response = authorized_client.get(
+                    address, HTTP_IF_NONE_MATCH=guest['ETag']
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertFalse(response.has_header('Last-Modified'))
+
+
+class SearchViewTest(TestCase):
+    '''Поиск по постам через полнотекстовый индекс.'''
+
+    @classmethod
+    def setUpClass(cls):
+        '''Вызывается один раз перед запуском всех тестов класса.'''
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username='Mokrushin', email='admin@yatube.ru', password='admin'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Котики котики и собаки'
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user, text='Только собаки, много собак'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Кот номер {number}')
+            for number in range(settings.NUM_POSTS)
+        )
+
+    def setUp(self):
+        '''Подготовка прогона теста. Вызывается перед каждым тестом.'''
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+        return response.context['page_obj']
+
+    def test_search_finds_matching_posts(self):
+        '''Проверка: поиск находит посты по словам и их началу.'''
+        self.assertEqual(list(self.search('собак')), [
+            self.other_post, self.post
+        ])
+        self.assertEqual(list(self.search('котики собаки')), [self.post])
+        self.assertEqual(list(self.search('""*) OR NEAR(')), [])
+
+    def test_search_index_follows_post_changes(self):
+        '''Проверка: правка и удаление поста обновляют индекс.'''
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Теперь про хомяков'
+        post.save()
+        self.assertEqual(list(self.search('хомяков')), [post])
+        self.assertNotIn(post, self.search('котики'))
+        post.delete()
+        self.assertEqual(list(self.search('хомяков')), [])
+
+    def test_search_cursor_pages(self):
+        '''Проверка: курсоры поиска листают результаты без повторов.'''
+        first_page = self.search('кот')
+        self.assertTrue(first_page.has_next())
+        second_page = self.search('кот', cursor=first_page.next_cursor)
+        self.assertEqual(
+            len(first_page) + len(second_page), settings.NUM_POSTS + 1
+        )
+        self.assertEqual(set(first_page) & set(second_page), set())
+        previous_page = self.search(
+            'кот', cursor=second_page.previous_cursor
+        )
+        self.assertEqual(list(previous_page), list(first_page))
+
+    def test_search_cursor_to_deleted_posts(self):
+        '''Проверка: курсор поиска к удалённым постам открывает
+        последнюю страницу, а не ошибку.
+        '''
+        first_page = self.search('кот')
+        second_page = self.search('кот', cursor=first_page.next_cursor)
+        for post in second_page:
+            post.delete()
+        page_obj = self.search('кот', cursor=first_page.next_cursor)
+        self.assertEqual(list(page_obj), list(first_page))
+        self.assertFalse(page_obj.has_next())
+
+    def test_admin_search_uses_index(self):
+        '''Проверка: поиск в админке находит посты через индекс.'''
+        self.guest_client.force_login(self.user)
+        response = self.guest_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собак'}
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list),
+            {self.post, self.other_post},
+        )
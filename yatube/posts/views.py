@@ -1,36 +1,81 @@
+from functools import partial
+
 from django.conf import settings
-from django.core.paginator import Paginator
 from django.contrib.auth import get_user_model
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 
+from core.routers import replica_reads
+
+from .cache import cache_anonymous_page, conditional_page
+from .counts import ApproximateCount, counter_count
 from .forms import PostForm
-from .models import Group, Post, User
+from .group_feeds import GroupFeedPaginator, get_group_feed
+from .lookups import author_by_username, group_by_slug
+from .models import AuthorStats, Post, User
+from .paginators import CursorPaginator
+from .search import SearchPaginator
 
 User = get_user_model()
 
 
-def paginator(request, post_list):
-    paginator = Paginator(post_list, settings.NUM_POSTS)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+def paginate(request, paginator):
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return paginator.get_cursor_page(cursor)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def paginator(request, post_list, count=None,
+              paginator_class=CursorPaginator):
+    '''Страница ленты.
 
+    count — число постов или способ его получить из posts.counts;
+    по умолчанию COUNT(*) не дальше PAGINATOR_COUNT_LIMIT.
+    '''
+    return paginate(
+        request,
+        paginator_class(
+            post_list,
+            settings.NUM_POSTS,
+            count=count,
+            count_limit=settings.PAGINATOR_COUNT_LIMIT,
+            window=settings.PAGINATOR_WINDOW,
+        ),
+    )
 
+
+@replica_reads
+@conditional_page('index')
+@cache_anonymous_page('index')
 def index(request):
-    post_list = Post.objects.select_related('group')
-    page_obj = paginator(request, post_list)
+    post_list = Post.objects.for_feed()
+    page_obj = paginator(request, post_list, ApproximateCount('index'))
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+def group_feeds(request, slug):
+    '''Лента группы или None, если группы нет.'''
+    if group_by_slug.get(slug) is None:
+        return None
+    return [f'group:{slug}']
+
+
+@replica_reads
+@conditional_page(group_feeds)
+@cache_anonymous_page(group_feeds)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
-    paginator = Paginator(posts, settings.NUM_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = group_by_slug.get_or_404(slug)
+    posts = Post.objects.for_feed().filter(group=group)
+    page_obj = paginator(
+        request,
+        posts,
+        counter_count(group.posts_count),
+        partial(GroupFeedPaginator, feed=get_group_feed(group.pk)),
+    )
     context = {
         'group': group,
         'page_obj': page_obj
@@ -38,10 +83,24 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+def profile_feeds(request, username):
+    '''Лента автора или None, если автора нет.'''
+    if author_by_username.get(username) is None:
+        return None
+    return [f'profile:{username}']
+
+
+@replica_reads
+@conditional_page(profile_feeds)
+@cache_anonymous_page(profile_feeds)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = Post.objects.select_related('author').filter(author=author)
-    page_obj = paginator(request, post_list)
+    author = author_by_username.get_or_404(username)
+    post_list = Post.objects.for_feed().filter(author=author)
+    try:
+        posts_count = author.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        posts_count = 0
+    page_obj = paginator(request, post_list, counter_count(posts_count))
     context = {
         'page_obj': page_obj,
         'author': author,
@@ -49,15 +108,46 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+def post_feeds(request, post_id):
+    '''Ленты страницы поста: сам пост и автор со счётчиком постов.'''
+    usernames = Post.objects.filter(pk=post_id).order_by().values_list(
+        'author__username', flat=True
+    )
+    if not usernames:
+        return None
+    return [f'post:{post_id}', f'profile:{usernames[0]}']
+
+
+@replica_reads
+@conditional_page(post_feeds)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post.objects.select_related('author'),
-                             pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id
+    )
     context = {
         'post': post,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = paginate(
+        request,
+        SearchPaginator(
+            query,
+            settings.NUM_POSTS,
+            count_limit=settings.PAGINATOR_COUNT_LIMIT,
+            window=settings.PAGINATOR_WINDOW,
+        ),
+    )
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None)
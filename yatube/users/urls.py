@@ -9,6 +9,9 @@ from django.contrib.auth.views import (
     PasswordResetCompleteView,
 )
 from django.urls import path
+
+from core.ratelimit import rate_limit
+
 from . import views
 
 app_name = 'users'
@@ -24,10 +27,18 @@ urlpatterns = [
     ),
     # Полный адрес страницы регистрации - auth/signup/,
     # но префикс auth/ обрабатывется в головном urls.py
-    path('signup/', views.SignUp.as_view(), name='signup'),
+    # Попытки регистрации и входа ограничены до хэширования пароля,
+    # лимиты — в RATELIMITS.
+    path(
+        'signup/',
+        rate_limit('signup')(views.SignUp.as_view()),
+        name='signup'
+    ),
     path(
         'login/',
-        LoginView.as_view(template_name='users/login.html'),
+        rate_limit('login', username_field='username')(
+            LoginView.as_view(template_name='users/login.html')
+        ),
         name='login'
     ),
     # Смена пароля password_change_form.html
@@ -0,0 +1,180 @@
+"""
+ASGI config for yatube project.
+
+Django 2.2 не умеет ASGI и асинхронные представления, поэтому здесь
+ASGI-приложение поверх обычного WSGIHandler: цикл событий держит
+соединения, а представления (и вся работа с ORM) выполняются в пуле из
+ASGI_THREADS потоков. Синхронные представления и yatube.wsgi остаются
+без изменений.
+
+    uvicorn yatube.asgi:application
+"""
+
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+wsgi_application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'TEMPLATES_WARMUP', False):
+    from core.warmup import warm_templates
+
+    warm_templates()
+
+
+class ASGIBridge:
+    '''ASGI 3 приложение, которое выполняет WSGI-приложение в пуле.
+
+    Запрос и итерация ответа идут в одном потоке пула: соединения
+    Django с базой привязаны к потоку. Части ответа передаются в цикл
+    событий через очередь ограниченного размера, поэтому потоковые
+    ответы не копятся в памяти.
+    '''
+    QUEUE_SIZE = 8
+
+    def __init__(self, wsgi_app, max_workers):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f'Unsupported scope type {scope["type"]}')
+        body = await self.read_body(receive)
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.QUEUE_SIZE)
+        environ = self.build_environ(scope, body)
+        worker = loop.run_in_executor(
+            self.executor, self.run_wsgi, environ, loop, queue
+        )
+        started = finished = False
+        try:
+            while not finished:
+                kind, *payload = await queue.get()
+                if kind == 'start':
+                    status, headers = payload
+                    await send({
+                        'type': 'http.response.start',
+                        'status': int(status.split(' ', 1)[0]),
+                        'headers': [
+                            (name.lower().encode('latin-1'),
+                             value.encode('latin-1'))
+                            for name, value in headers
+                        ],
+                    })
+                    started = True
+                elif kind == 'body':
+                    await send({
+                        'type': 'http.response.body',
+                        'body': payload[0],
+                        'more_body': True,
+                    })
+                else:
+                    finished = True
+            if not started:
+                # WSGI-приложение упало до start_response.
+                await send({
+                    'type': 'http.response.start',
+                    'status': 500,
+                    'headers': [(b'content-type', b'text/plain')],
+                })
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            # Если клиент ушёл, дочитываем очередь, чтобы поток пула
+            # не остался ждать места в ней.
+            while not finished:
+                finished = (await queue.get())[0] == 'end'
+            await worker
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        '''Тело запроса; большие тела уходят во временный файл.'''
+        body = SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            body.write(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        body.seek(0)
+        return body
+
+    def build_environ(self, scope, body):
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('127.0.0.1', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            # WSGI передаёт байты пути как строку latin-1.
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server_name,
+            'SERVER_PORT': str(server_port),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f'HTTP_{name}'
+            if name in environ:
+                value = f'{environ[name]},{value}'
+            environ[name] = value
+        return environ
+
+    def run_wsgi(self, environ, loop, queue):
+        def put(*item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            put('start', status, headers)
+
+        try:
+            response = self.wsgi_app(environ, start_response)
+            try:
+                for chunk in response:
+                    if chunk:
+                        put('body', chunk)
+            finally:
+                if hasattr(response, 'close'):
+                    response.close()
+        finally:
+            environ['wsgi.input'].close()
+            put('end')
+
+
+application = ASGIBridge(
+    wsgi_application, getattr(settings, 'ASGI_THREADS', 8)
+)
@@ -34,6 +34,52 @@ ALLOWED_HOSTS = [
 ]
 
 NUM_POSTS = 10
+# Сколько страниц показывать по обе стороны от текущей в навигации.
+PAGINATOR_WINDOW = 2
+# Ленты без готового счётчика считаются не дальше этого числа постов;
+# у более длинных навигация не показывает последнюю страницу.
+# None — всегда точный COUNT(*).
+PAGINATOR_COUNT_LIMIT = 10_000
+# Ленты с ApproximateCount (posts/counts.py) длиннее порога показывают
+# оценку числа постов, которая обновляется раз в таймаут, секунды.
+PAGINATOR_APPROXIMATE_THRESHOLD = 10_000
+PAGINATOR_COUNT_CACHE_TIMEOUT = 60
+
+# Время жизни HTML карточек постов в кэше, секунды.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+# Страницы лент для гостей сбрасываются версиями лент,
+# таймаут лишь ограничивает время хранения.
+FEED_PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Сколько новых постов группы хранит её лента в кэше и как долго;
+# ленты правятся сигналами, таймаут лишь ограничивает время хранения.
+GROUP_FEED_LENGTH = 1000
+GROUP_FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Кэш групп и авторов по slug и имени из адреса (core/lookups.py):
+# размер и TTL памяти процесса, время жизни найденных и ненайденных
+# ключей в общем кэше, секунды.
+LOOKUP_LOCAL_SIZE = 1024
+LOOKUP_LOCAL_TTL = 5
+LOOKUP_CACHE_TIMEOUT = 60 * 5
+LOOKUP_NEGATIVE_TIMEOUT = 60
+
+# JSON API постов: наибольший размер страницы и число постов в одном
+# куске потоковой выгрузки format=ndjson.
+API_MAX_LIMIT = 100
+API_STREAM_CHUNK_SIZE = 2000
+
+# Размер LRU-кэша тега {% url %} из core/templatetags/cached_url.py.
+URL_CACHE_SIZE = 4096
+
+# Доля запросов, для которых RequestMetricsMiddleware считает SQL и
+# время шаблонов; в продакшене достаточно 0.01–0.1.
+REQUEST_METRICS_SAMPLE_RATE = 1.0
+# Сколько последних запросов каждого представления держит сводка.
+REQUEST_METRICS_WINDOW = 500
+# Сколько самых медленных SQL-запросов попадает в строку JSON, которую
+# middleware пишет в логгер core.metrics с уровнем INFO.
+REQUEST_METRICS_SLOW_QUERIES = 3
 
 # Application definition
 
@@ -51,11 +97,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.metrics.RequestMetricsMiddleware',
+    'core.middleware.replica.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -65,7 +113,9 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с учётом времени отрисовки в метриках запроса.
+        'BACKEND': 'core.metrics.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -82,7 +132,13 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать все шаблоны при загрузке yatube.wsgi; имеет смысл
+# только с cached.Loader, как в yatube.settings_prod.
+TEMPLATES_WARMUP = False
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
+# Потоков пула, в котором yatube.asgi выполняет представления.
+ASGI_THREADS = 8
 
 
 # Database
@@ -92,9 +148,81 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение переживает запрос и не открывается заново.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+    },
+    # Копия default для чтения лент, которую обновляет replicate_db.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv(
+            'DB_REPLICA_NAME', os.path.join(BASE_DIR, 'db.replica.sqlite3')
+        ),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# Чтения представлений с replica_reads идут на реплику, запись — в
+# default (core/routers.py). None отключает реплику.
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_DATABASE = 'replica'
+# Сколько секунд после своей записи посетитель читает основную базу.
+REPLICA_PIN_SECONDS = 10
+REPLICA_PIN_COOKIE = 'primary_reads'
+
+# Прагмы, которые core/db.py выполняет на каждом новом соединении
+# SQLite: WAL пускает читателей параллельно с записью, busy_timeout
+# (мс) заставляет ждать блокировку, а не падать с "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# Для нескольких процессов на одном сервере подойдёт
+# django.core.cache.backends.filebased.FileBasedCache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Сессии: cached_db читает базу только при промахе кэша, а
+# core.signed_sessions хранит сессию в подписанной cookie, а в базе —
+# лишь отозванные (core.models.RevokedSession). Истёкшие сессии в базе удаляет
+# clear_expired_sessions.
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+)
+# Сколько секунд пользователь сессии живёт в кэше (core/auth.py);
+# сохранение пользователя сбрасывает его раньше. С кэшем в памяти
+# процесса пользователь не кэшируется.
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
+# Лимиты POST-запросов входа и регистрации (core/ratelimit.py): по IP
+# и по имени пользователя — ёмкость корзины токенов и за сколько
+# секунд она наполняется заново. Корзины хранятся в кэше, а если он
+# недоступен — в памяти процесса, не больше RATELIMIT_LOCAL_SIZE.
+RATELIMITS = {
+    'login': {'ip': (20, 60), 'username': (5, 60)},
+    'signup': {'ip': (5, 60 * 10)},
+}
+RATELIMIT_LOCAL_SIZE = 10_000
+# Адрес клиента для лимитов по IP. Без прокси это REMOTE_ADDR. За
+# обратным прокси у всех клиентов один REMOTE_ADDR — адрес прокси,
+# поэтому задайте заголовок в формате request.META, куда прокси
+# дописывает адрес клиента (например, HTTP_X_FORWARDED_FOR), и число
+# доверенных прокси перед приложением: клиентом считается адрес на
+# столько позиций от конца списка. Левее стоят адреса, которые клиент
+# мог подставить сам.
+RATELIMIT_IP_HEADER = os.getenv('RATELIMIT_IP_HEADER', '')
+RATELIMIT_TRUSTED_PROXIES = int(os.getenv('RATELIMIT_TRUSTED_PROXIES', 1))
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
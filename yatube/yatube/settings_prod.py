@@ -0,0 +1,71 @@
+"""
+Продакшен-профиль: DJANGO_SETTINGS_MODULE=yatube.settings_prod.
+
+Отличается от yatube.settings выключенным DEBUG, общим для воркеров
+кэшем, кешированным загрузчиком шаблонов с прогревом при старте воркера
+и выборочными метриками запросов.
+"""
+import os
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+if os.environ.get('DJANGO_ALLOWED_HOSTS'):
+    ALLOWED_HOSTS = os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
+
+# Страницы, карточки постов, ленты групп, их версии и пользователи
+# сессий сбрасываются сигналами в одном процессе, а читаются всеми
+# воркерами, поэтому кэш должен быть общим. Memcached
+# (MEMCACHED_LOCATION=host:port[,host:port]) атомарно выполняет add и
+# incr версий; без него кэш хранится в файлах CACHE_DIR, общих для
+# процессов одного сервера. Файловый кэш при каждой записи считает
+# свои файлы, поэтому MAX_ENTRIES у него умеренный.
+if os.getenv('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': os.environ['MEMCACHED_LOCATION'].split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv(
+                'CACHE_DIR', os.path.join(BASE_DIR, 'cache')
+            ),
+            'OPTIONS': {'MAX_ENTRIES': 50_000, 'CULL_FREQUENCY': 10},
+        }
+    }
+
+# Скомпилированные шаблоны живут в памяти процесса; APP_DIRS несовместим
+# с явным списком загрузчиков, поэтому шаблоны приложений ищет
+# app_directories.Loader.
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0].pop('APP_DIRS')
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+# Компилировать все шаблоны при загрузке yatube.wsgi.
+TEMPLATES_WARMUP = True
+
+REQUEST_METRICS_SAMPLE_RATE = 0.05
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.metrics': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}